@@ -1,81 +1,193 @@
-import os, json, time, re, sqlite3, shutil, requests, threading
+import os, json, time, re, gzip, zlib, base64, atexit, queue, sqlite3, shutil, hashlib, requests, threading
+from bisect import bisect_right
 from datetime import datetime, timedelta, date
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 try:
     from dotenv import load_dotenv
 except Exception:
     load_dotenv = None
+try:
+    import orjson  # optional fast encoder for cached response bodies
+except ImportError:
+    orjson = None
+try:
+    import brotli  # optional; adds a br variant next to gzip
+except ImportError:
+    brotli = None
 
 if load_dotenv:
     load_dotenv(".env")
 from flask import (
     Flask, jsonify, make_response, render_template, request,
-    redirect, url_for, session, g, send_from_directory
+    redirect, url_for, session, g, send_from_directory, stream_with_context
 )
 from werkzeug.security import generate_password_hash, check_password_hash
 
-LAST_GOOD_PATH = "last_good_timetable.json"
-LAST_GOOD = None
-LAST_GOOD_TS = 0
-LAST_BACKUP_PATH = "last_backup.json"
+from archive import TimetableArchive
+from caching import SingleFlight, make_cache
+from storage import atomic_write_json, file_lock, read_json
+
+LAST_GOOD_PATH = "last_good_timetable.json"  # legacy single-week file, migrated on startup
+LAST_GOOD_DIR = os.environ.get("LAST_GOOD_DIR", "last_good")  # one <weekStart>.json per week
+LAST_GOOD_WEEKS = int(os.environ.get("LAST_GOOD_WEEKS", "12"))  # most recently written weeks kept
+LAST_BACKUP_PATH = "last_backup.json"  # legacy pretty-printed copy, read only as a fallback
+LAST_BACKUP_GZ_PATH = "last_backup.ndjson.gz"
 
 def no_store(resp):
     resp.headers["Cache-Control"] = "no-store"
     return resp
 
-def load_last_good():
-    global LAST_GOOD, LAST_GOOD_TS
-    try:
-        if os.path.exists(LAST_GOOD_PATH):
-            with open(LAST_GOOD_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                LAST_GOOD = data
-                LAST_GOOD_TS = data.get("_cachedAt", 0)
-    except Exception:
-        pass
+# Last-known-good timetable per week: requests only queue the payload, a writer thread
+# persists it atomically and prunes to LAST_GOOD_WEEKS files.
+_last_good_cv = threading.Condition()
+_last_good_pending: dict[str, dict] = {}  # weekStart -> payload not yet on disk
+_last_good_thread: threading.Thread | None = None
+
+def _last_good_path(weekkey: str) -> str:
+    return os.path.join(LAST_GOOD_DIR, f"{weekkey}.json")
+
+def load_last_good(weekkey: str) -> dict | None:
+    """Last good payload for one week (queued or on disk), or None."""
+    with _last_good_cv:
+        pending = _last_good_pending.get(weekkey)
+    if pending is not None:
+        return pending
+    return read_json(_last_good_path(weekkey))
 
 def save_last_good(payload):
+    """Queue payload as the last good timetable of its week; never blocks on disk."""
+    global _last_good_thread
+    weekkey = str(payload.get("weekStart") or "")
+    if not weekkey:
+        return
+    with _last_good_cv:
+        _last_good_pending[weekkey] = payload  # a newer payload for the same week replaces the queued one
+        if _last_good_thread is None:
+            _last_good_thread = threading.Thread(target=_last_good_worker, name="last-good-writer", daemon=True)
+            _last_good_thread.start()
+            atexit.register(_flush_last_good)
+        _last_good_cv.notify()
+
+def _flush_last_good() -> None:
+    with _last_good_cv:
+        batch = dict(_last_good_pending)
+    for weekkey, payload in batch.items():
+        try:
+            atomic_write_json(_last_good_path(weekkey), payload)
+        except Exception as exc:
+            app.logger.warning("last-good write failed for %s: %s", weekkey, exc)
+            continue
+        with _last_good_cv:
+            if _last_good_pending.get(weekkey) is payload:
+                del _last_good_pending[weekkey]
+    if batch:
+        _prune_last_good()
+
+def _prune_last_good() -> None:
     try:
-        with open(LAST_GOOD_PATH, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+        paths = [os.path.join(LAST_GOOD_DIR, n) for n in os.listdir(LAST_GOOD_DIR) if n.endswith(".json")]
+        paths.sort(key=os.path.getmtime, reverse=True)
+    except OSError:
+        return
+    for path in paths[max(1, LAST_GOOD_WEEKS):]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _last_good_worker() -> None:
+    while True:
+        with _last_good_cv:
+            while not _last_good_pending:
+                _last_good_cv.wait()
+        _flush_last_good()
+        time.sleep(1)  # let bursts (prefetch, refresher) collapse into one pass
+
+def _migrate_last_good() -> None:
+    """Move the legacy single-week file into the per-week store."""
+    legacy = read_json(LAST_GOOD_PATH)
+    if isinstance(legacy, dict) and legacy.get("weekStart"):
+        path = _last_good_path(str(legacy["weekStart"]))
+        if not os.path.exists(path):
+            atomic_write_json(path, legacy)
+    if legacy is not None:
+        try:
+            os.remove(LAST_GOOD_PATH)
+        except OSError:
+            pass
 
 def _save_last_backup(payload: dict) -> None:
-    """Persist the last imported backup so we can fall back to it for profiles."""
+    """Persist the last imported backup (gzip NDJSON) so we can fall back to it for profiles."""
+    tmp = f"{LAST_BACKUP_GZ_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
     try:
-        with open(LAST_BACKUP_PATH, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        with gzip.open(tmp, "wb") as f:
+            for line in _ndjson_lines(_backup_records_from_payload(payload)):
+                f.write(line)
+        os.replace(tmp, LAST_BACKUP_GZ_PATH)
     except Exception:
         pass
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _iter_last_backup_users():
+    """User entries of the last saved backup, read line by line (legacy JSON file as fallback)."""
+    if os.path.exists(LAST_BACKUP_GZ_PATH):
+        with gzip.open(LAST_BACKUP_GZ_PATH, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get("section") == "users" and isinstance(record.get("row"), dict):
+                    yield record["row"]
+        return
+    if os.path.exists(LAST_BACKUP_PATH):
+        with open(LAST_BACKUP_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        yield from data.get("database", {}).get("users", [])
+
+# username -> profile of the last restored backup, kept in the backup_profiles table; filled in
+# the restore transaction, or once per process from the last-backup file when still empty
+_backup_profiles_checked = False
+
+def _ensure_backup_profiles() -> None:
+    global _backup_profiles_checked
+    if _backup_profiles_checked:
+        return
+    db = get_db()
+    if db.execute("SELECT 1 FROM backup_profiles LIMIT 1").fetchone() is None:
+        try:
+            rows = [r for r in map(_norm_backup_user, _iter_last_backup_users()) if r]
+        except Exception:
+            rows = []
+        db.executemany("INSERT OR REPLACE INTO backup_profiles (username, profile_json) VALUES (?, ?)",
+                       [(r[1], r[4]) for r in rows if r[4] is not None])
+        db.commit()
+    _backup_profiles_checked = True
 
 def _backup_profile_for(username: str) -> dict | None:
     """Return profile from last saved backup for a given username (if present)."""
     try:
-        if not os.path.exists(LAST_BACKUP_PATH):
-            return None
-        with open(LAST_BACKUP_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        users = data.get("database", {}).get("users", [])
-        for u in users:
-            if str(u.get("username") or "").strip() == username:
-                prof = u.get("profile")
-                if isinstance(prof, dict):
-                    return _normalise_profile(prof)
-        return None
+        _ensure_backup_profiles()
+        row = get_db().execute("SELECT profile_json FROM backup_profiles WHERE username = ?", (username,)).fetchone()
+        return _normalise_profile(json.loads(row["profile_json"])) if row else None
     except Exception:
         return None
 
-load_last_good()
+try:
+    _migrate_last_good()
+except Exception:
+    pass
 
 # ---- Untis client (your existing implementation) ----
 from untis_client import (
-    fetch_week,
     fetch_week_all,
-    fetch_exams,
-    fetch_subject_map,
-    fetch_class_map,
-    fetch_teacher_map,
+    fetch_week_many,
+    run_per_grade,
+    fetch_exams_bundle,
+    invalidate_master_data,
     available_grades,
 )
 
@@ -108,6 +220,31 @@ BACKUP_WEBHOOK_URL   = os.environ.get("BACKUP_WEBHOOK_URL")
 BACKUP_WEBHOOK_TOKEN = None  # auth disabled
 AUTO_RESTORE_URL     = os.environ.get("AUTO_RESTORE_URL")
 AUTO_BACKUP_INTERVAL_MIN = int(os.environ.get("AUTO_BACKUP_INTERVAL_MIN", "5"))
+BACKUP_DEBOUNCE_SEC  = float(os.environ.get("BACKUP_DEBOUNCE_SEC", "3"))  # quiet time before a queued upload
+BACKUP_MAX_DELAY_SEC = float(os.environ.get("BACKUP_MAX_DELAY_SEC", "30"))  # cap while triggers keep arriving
+BACKUP_WEBHOOK_GZIP  = str(os.environ.get("BACKUP_WEBHOOK_GZIP", "")).strip().lower() in ("1", "true", "yes", "on")
+BACKUP_BATCH_ROWS    = max(1, int(os.environ.get("BACKUP_BATCH_ROWS", "500")))  # rows per fetchmany/executemany
+BACKUP_INCREMENTAL   = str(os.environ.get("BACKUP_INCREMENTAL", "")).strip().lower() in ("1", "true", "yes", "on")
+BACKUP_FULL_EVERY    = int(os.environ.get("BACKUP_FULL_EVERY", "24"))  # deltas before the next full snapshot
+PREFETCH_WEEKS     = int(os.environ.get("PREFETCH_WEEKS", "3"))  # weeks after the viewed one; 0 disables
+CACHE_BACKEND      = os.environ.get("CACHE_BACKEND", "memory")  # memory | sqlite (shared by all workers)
+CACHE_PATH         = os.environ.get("CACHE_PATH", os.path.join(DATA_DIR, "cache.db"))
+CACHE_MAX_ENTRIES  = int(os.environ.get("CACHE_MAX_ENTRIES", "256"))
+CACHE_TTL_SEC      = int(os.environ.get("CACHE_TTL_SEC", str(7 * 24 * 3600)))  # how long stale entries are kept
+CACHE_STALE_SEC    = int(os.environ.get("CACHE_STALE_SEC", "15"))  # school hours: older entries are served, then revalidated
+CACHE_FAILED_SEC   = int(os.environ.get("CACHE_FAILED_SEC", "60"))  # failed fetches: cache TTL and revalidation back-off
+REFRESH_INTERVAL_SEC = int(os.environ.get("REFRESH_INTERVAL_SEC", "120"))  # background refresher in school hours; 0 disables
+# freshness policy (APP_TZ): tighter in the morning substitution window, looser off-hours and for far weeks
+FRESH_PEAK_HOURS   = os.environ.get("FRESH_PEAK_HOURS", "06:30-08:30")  # school days, TTL FRESH_PEAK_SEC
+FRESH_PEAK_SEC     = int(os.environ.get("FRESH_PEAK_SEC", "10"))
+FRESH_DAY_HOURS    = os.environ.get("FRESH_DAY_HOURS", "06:00-16:00")  # school days, TTL CACHE_STALE_SEC
+FRESH_OFF_SEC      = int(os.environ.get("FRESH_OFF_SEC", "900"))  # nights, weekends, vacation days
+FRESH_FAR_WEEKS    = int(os.environ.get("FRESH_FAR_WEEKS", "2"))  # weeks this far ahead (or past ones) ...
+FRESH_FAR_SEC      = int(os.environ.get("FRESH_FAR_SEC", "3600"))  # ... are fresh for at least this long
+ARCHIVE_PATH       = os.environ.get("ARCHIVE_PATH", os.path.join(DATA_DIR, "archive.db"))  # frozen past weeks
+ARCHIVE_MAX_AGE_SEC = int(os.environ.get("ARCHIVE_MAX_AGE_SEC", str(7 * 24 * 3600)))  # browser cache for archived weeks
+FORCE_MIN_INTERVAL_SEC = int(os.environ.get("FORCE_MIN_INTERVAL_SEC", "60"))  # force=1 honoured once per key/window
+FORCE_RATE_PER_MIN   = int(os.environ.get("FORCE_RATE_PER_MIN", "4"))  # honoured force=1 per session and minute
 SETTINGS_DEFAULTS  = {
     "timeColumnWidth": "60",
     "updateBannerText": "",
@@ -115,25 +252,60 @@ SETTINGS_DEFAULTS  = {
     "updateBannerUpdatedAt": "0",
 }
 BACKUP_VERSION     = 3
+DB_POOL_SIZE       = int(os.environ.get("DB_POOL_SIZE", "8"))  # idle SQLite connections kept for reuse
+DB_CACHE_SIZE_KB   = int(os.environ.get("DB_CACHE_SIZE_KB", "8192"))
+DB_MMAP_SIZE_MB    = int(os.environ.get("DB_MMAP_SIZE_MB", "64"))
+SNAPSHOT_DIR       = os.environ.get("SNAPSHOT_DIR", os.path.join(DATA_DIR, "snapshots"))
+SNAPSHOT_INTERVAL_MIN = int(os.environ.get("SNAPSHOT_INTERVAL_MIN", "30"))  # 0 disables local snapshots
+SNAPSHOT_KEEP      = int(os.environ.get("SNAPSHOT_KEEP", "6"))  # newest snapshots always kept
+SNAPSHOT_KEEP_DAYS = int(os.environ.get("SNAPSHOT_KEEP_DAYS", "7"))  # plus the last snapshot of each of these days
 
 if not ADMIN_TOKEN:
     raise RuntimeError("ADMIN_TOKEN environment variable is required and must not be empty.")
 
 def _ensure_db_path() -> None:
-    """Make sure DB directory exists and is writable (SQLite only)."""
+    """Make sure DB directory exists and is writable (SQLite only). Runs once at startup."""
     db_dir = os.path.dirname(DB_PATH) or "."
     try:
         os.makedirs(db_dir, exist_ok=True)
-        test_path = os.path.join(db_dir, ".db_write_test")
+        test_path = os.path.join(db_dir, f".db_write_test.{os.getpid()}")
         with open(test_path, "w", encoding="utf-8") as f:
             f.write("ok")
         os.remove(test_path)
     except Exception as exc:
         raise RuntimeError(f"Database path not writable: {DB_PATH} ({exc})")
 
+def _connect_db() -> sqlite3.Connection:
+    """Open a tuned connection: WAL journal, NORMAL sync, larger page cache, mmap reads."""
+    conn = sqlite3.connect(DB_PATH, timeout=10, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{max(0, DB_CACHE_SIZE_KB)}")
+    conn.execute(f"PRAGMA mmap_size={max(0, DB_MMAP_SIZE_MB) * 1024 * 1024}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+# idle connections, reused across requests and threads (one user at a time)
+_db_pool: queue.LifoQueue = queue.LifoQueue(maxsize=max(1, DB_POOL_SIZE))
+
+def _db_acquire() -> sqlite3.Connection:
+    try:
+        return _db_pool.get_nowait()
+    except queue.Empty:
+        return _connect_db()
+
+def _db_release(conn: sqlite3.Connection) -> None:
+    try:
+        if conn.in_transaction:
+            conn.rollback()  # never hand a half-done transaction to the next request
+        _db_pool.put_nowait(conn)
+    except (queue.Full, sqlite3.Error):
+        conn.close()
+
 def init_db():
     _ensure_db_path()
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect_db()
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS users (
@@ -169,6 +341,14 @@ def init_db():
         )
         """
     )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS backup_profiles (
+            username TEXT PRIMARY KEY,
+            profile_json TEXT NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS exams_manual (
@@ -231,17 +411,14 @@ def init_db():
 
 def get_db():
     if "db" not in g:
-        _ensure_db_path()
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        g.db = conn
+        g.db = _db_acquire()
     return g.db
 
 @app.teardown_appcontext
 def close_db(exception):
     conn = g.pop("db", None)
     if conn is not None:
-        conn.close()
+        _db_release(conn)
 
 init_db()
 
@@ -296,8 +473,8 @@ def _grade_prefixed_courses(values: list[str]) -> list[str]:
     """Normalise courses and add EF:/Q1: prefix when grade can be inferred from mappings."""
     if not isinstance(values, list):
         return []
-    courses_ef = _course_map_normalized_for_grade("EF")
-    courses_q1 = _course_map_normalized_for_grade("Q1")
+    courses_ef = _course_map_index_for_grade("EF")
+    courses_q1 = _course_map_index_for_grade("Q1")
     out: list[str] = []
     seen: set[str] = set()
     for item in values:
@@ -427,14 +604,111 @@ def _load_profile_for_user(row):
     prof["courses"] = _ensure_grade_prefix(prof.get("courses") or [], "EF")
     return prof
 
+# process-level snapshot of the settings table, keyed by the version stamp file; writers in
+# any worker replace the stamp after committing, so other workers reload on their next read
+SETTINGS_STAMP_PATH = f"{DB_PATH}.settings-version"
+_settings_cache: tuple | None = None  # (stamp, {key: value})
+
+def _settings_stamp():
+    try:
+        st = os.stat(SETTINGS_STAMP_PATH)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+def _invalidate_settings() -> None:
+    """Drop the local snapshot and bump the stamp so all workers reload settings."""
+    global _settings_cache
+    _settings_cache = None
+    try:
+        atomic_write_json(SETTINGS_STAMP_PATH, time.time_ns())
+    except OSError as exc:
+        app.logger.warning("could not write settings version stamp: %s", exc)
+
+def _settings_snapshot() -> dict:
+    """All stored settings from one query; reused until the version stamp changes."""
+    global _settings_cache
+    stamp = _settings_stamp()  # read before the query: a concurrent write only forces another reload
+    cached = _settings_cache
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    cur = get_db().execute("SELECT key, value FROM settings")
+    values = {row["key"]: row["value"] for row in cur.fetchall() if row["value"] is not None}
+    _settings_cache = (stamp, values)
+    return values
+
 def _get_setting(key, default=None):
-    db = get_db()
-    cur = db.execute("SELECT value FROM settings WHERE key = ?", (key,))
-    row = cur.fetchone()
-    if row and row["value"] is not None:
-        return row["value"]
+    value = _settings_snapshot().get(key)
+    if value is not None:
+        return value
     return SETTINGS_DEFAULTS.get(key, default)
 
+# Vacation interval index: vacations merged into disjoint spans (entries that touch or are
+# only separated by a weekend join), so "is this range fully off?" is one bisect. Versioned
+# by a stamp file like the settings snapshot, so edits in any worker reach all of them.
+VACATIONS_STAMP_PATH = f"{DB_PATH}.vacations-version"
+_vacation_cache: tuple | None = None  # (stamp, [span start], [(start, end, [(start, end, title)])])
+
+def _invalidate_vacations() -> None:
+    """Drop the local index and bump the stamp so all workers reload vacations."""
+    global _vacation_cache
+    _vacation_cache = None
+    try:
+        atomic_write_json(VACATIONS_STAMP_PATH, time.time_ns())
+    except OSError as exc:
+        app.logger.warning("could not write vacations version stamp: %s", exc)
+
+def _next_school_day(d: date) -> date:
+    d += timedelta(days=1)
+    while d.weekday() >= 5:
+        d += timedelta(days=1)
+    return d
+
+def _vacation_index() -> tuple[list[date], list[tuple[date, date, list]]]:
+    """(sorted span starts, spans) of the merged vacations; reloaded when the stamp changes."""
+    global _vacation_cache
+    stamp = _file_signature(VACATIONS_STAMP_PATH)  # read before the query, as for settings
+    cached = _vacation_cache
+    if cached is not None and cached[0] == stamp:
+        return cached[1], cached[2]
+    entries = []
+    for row in get_db().execute("SELECT title, start_date, end_date FROM vacations").fetchall():
+        try:
+            first, last = _parse_iso_date(row["start_date"]), _parse_iso_date(row["end_date"])
+        except (TypeError, ValueError):
+            continue
+        entries.append((min(first, last), max(first, last), row["title"]))
+    entries.sort()
+    merged: list[list] = []
+    for entry in entries:
+        if merged and entry[0] <= _next_school_day(merged[-1][1]):
+            merged[-1][1] = max(merged[-1][1], entry[1])
+            merged[-1][2].append(entry)
+        else:
+            merged.append([entry[0], entry[1], [entry]])
+    spans = [(first, last, parts) for first, last, parts in merged]
+    starts = [span[0] for span in spans]
+    _vacation_cache = (stamp, starts, spans)
+    return starts, spans
+
+def _vacation_covering(start: date, end: date) -> str | None:
+    """Title of the vacation covering every school day (Mon-Fri) of start..end, else None."""
+    while start.weekday() >= 5:
+        start += timedelta(days=1)
+    while end.weekday() >= 5:
+        end -= timedelta(days=1)
+    if end < start:
+        return None  # weekend only
+    starts, spans = _vacation_index()
+    i = bisect_right(starts, start) - 1
+    if i < 0 or spans[i][1] < end:
+        return None
+    titles: list[str] = []
+    for first, last, title in spans[i][2]:
+        if first <= end and last >= start and title not in titles:
+            titles.append(title)
+    return " / ".join(titles)
+
 
 def _setting_as_bool(value) -> bool:
     return str(value or "").strip().lower() in ("1", "true", "yes", "on")
@@ -481,6 +755,7 @@ def _set_settings(values):
             (key, str(value))
         )
     db.commit()
+    _invalidate_settings()
 
 def _save_profile(user_id, profile):
     db = get_db()
@@ -535,19 +810,20 @@ def _split_rooms(value) -> list[str]:
     return [r for r in rooms if r]
 
 # ---------- Normalisation (canonical across app) ----------
-_UML = str.maketrans({"ä":"a","ö":"o","ü":"u","Ä":"a","Ö":"o","Ü":"u"})
+# umlaut fold; parens (inner text kept) and hyphen-like chars become spaces, collapsed below
+_NORM_TABLE = str.maketrans({"ä":"a","ö":"o","ü":"u","Ä":"a","Ö":"o","Ü":"u",
+                             "(":" ", ")":" ", "-":" ", "–":" ", "—":" "})
 
 def norm_key(s: str) -> str:
     """Canonical key for subjects/rooms: lower, umlaut fold, drop paren chars, dashes, tags, collapse spaces."""
     if not s:
         return ""
-    s = s.strip().translate(_UML).lower()
-    s = re.sub(r"\s+", " ", s)
-    s = s.replace("(", " ").replace(")", " ")  # keep inner text
-    s = re.sub(r"[-–—]+", " ", s)       # replace hyphen-like chars
+    return _norm_key_cached(s)
+
+@lru_cache(maxsize=4096)  # the subject/room vocabulary is a few hundred strings
+def _norm_key_cached(s: str) -> str:
     # keep GK/LK/AG markers to distinguish course types (previously stripped)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    return " ".join(s.translate(_NORM_TABLE).lower().split())
 
 def _monday_of(d: date) -> date:
     return d - timedelta(days=d.weekday())
@@ -557,6 +833,60 @@ def _no_store(resp):
     resp.headers["Pragma"] = "no-cache"
     return resp
 
+def _payload_etag(payload) -> str:
+    """Content hash of a JSON payload (independent of key order)."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+def _stamped_json_response(stamp, build):
+    """
+    JSON response whose weak ETag comes from a version stamp (file signatures etc.) instead
+    of the content: a matching If-None-Match is a 304 without building anything, and the
+    rendered body is kept in _body_cache, so build() runs once per version.
+    """
+    raw = repr((stamp, _file_signature(__file__)))  # a deploy changes the payload shape
+    return _cached_json_response(build, hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest())
+
+def _encode_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+def _render_payload(payload) -> dict[str, bytes]:
+    """Ready-to-send bodies of a payload: identity JSON plus gzip (and br when available)."""
+    raw = _encode_json(payload)
+    bodies = {"identity": raw, "gzip": gzip.compress(raw, compresslevel=6, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(raw, quality=9)
+    return bodies
+
+def _cached_json_response(payload, etag: str | None = None):
+    """
+    JSON response with a weak ETag that clients must revalidate; a match gets an empty 304.
+    The body comes pre-encoded and pre-compressed from _body_cache (rendered once per ETag)
+    and is picked by Accept-Encoding. payload may be a callable, built only on a body miss.
+    """
+    if etag is None:
+        etag = _payload_etag(payload)
+    if request.if_none_match.contains_weak(etag):
+        resp = app.response_class(status=304)
+    else:
+        entry = _body_cache.get(etag)
+        if entry is None:
+            bodies = _render_payload(payload() if callable(payload) else payload)
+            _body_cache.set(etag, bodies)
+        else:
+            bodies = entry[0]
+        accepted = request.accept_encodings
+        coding = next((c for c in ("br", "gzip") if c in bodies and accepted.quality(c) > 0), "identity")
+        resp = app.response_class(bodies[coding], mimetype="application/json")
+        if coding != "identity":
+            resp.headers["Content-Encoding"] = coding
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
 #  ---------- Mapping I/O ----------
 COURSE_MAP_PATH_EF = os.path.join(ROOT, "course_mapping_ef.txt")
 COURSE_MAP_PATH_Q1 = os.path.join(ROOT, "course_mapping_q1.txt")
@@ -624,7 +954,48 @@ def _load_cached_lessons_for_grade(grade: str) -> list[dict]:
         pass
     return []
 
+# parsed mapping files, keyed by (path, normalised); an entry is re-parsed only when the file's
+# inode/mtime/size signature changes. Returned dicts are shared: copy before mutating.
+_mapping_cache: dict[tuple[str, bool], tuple] = {}
+_mapping_version = 0
+
+def _file_signature(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _mapping_index(path: str, normalised: bool = True) -> dict[str, str]:
+    """Parsed mapping for path (read-only, shared); reloads only when the file changed."""
+    global _mapping_version
+    sig = _file_signature(path)
+    key = (path, normalised)
+    cached = _mapping_cache.get(key)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    mapping = (_read_mapping_normalised(path) if normalised else _read_mapping_txt(path)) if sig else {}
+    _mapping_cache[key] = (sig, mapping)
+    _mapping_version += 1
+    return mapping
+
+def _invalidate_mapping(path: str) -> None:
+    for normalised in (True, False):
+        _mapping_cache.pop((path, normalised), None)
+
+def mapping_version() -> int:
+    """Increments whenever a mapping file is (re)parsed in this process."""
+    return _mapping_version
+
 def load_mapping_txt(path):
+    """Return dict {lhs(normalized or raw key): rhs(display)} including empty rhs (a private copy)."""
+    return dict(_mapping_index(path, normalised=False))
+
+def _parse_mapping(file_path: str) -> dict[str, str]:
+    """Normalised-key mapping for file_path (a private copy; see _read_mapping_normalised)."""
+    return dict(_mapping_index(file_path))
+
+def _read_mapping_txt(path):
     """Return dict {lhs(normalized or raw key): rhs(display)} including empty rhs.
 
     Supports both key=value (legacy) and JSON with top-level grade blocks:
@@ -662,7 +1033,7 @@ def load_mapping_txt(path):
         pass
     return data
 
-def _parse_mapping(file_path: str) -> dict[str, str]:
+def _read_mapping_normalised(file_path: str) -> dict[str, str]:
     """Read mapping file; index by normalised key on the left. Empty right is allowed.
 
     Supports legacy key=value and JSON grade blocks; for grade blocks the grade
@@ -701,6 +1072,7 @@ def _write_mapping_txt(path: str, mapping: dict[str, str]) -> None:
         lines.append(f"{nk}={mapping[nk]}")
     with open(path, "w", encoding="utf-8") as f:
         f.write("\n".join(lines) + ("\n" if lines else ""))
+    _invalidate_mapping(path)
 
 # course mapping helpers (per-grade files, merged views)
 def _course_map_path_for_grade(grade: str) -> str | None:
@@ -709,28 +1081,26 @@ def _course_map_path_for_grade(grade: str) -> str | None:
 def _course_raw_map_for_grade(grade: str) -> dict[str, str]:
     path = _course_map_path_for_grade(grade)
     if path:
-        return load_mapping_txt(path)
+        return _mapping_index(path, normalised=False)
     # Unknown grade: do not cross-mix
     return {}
 
-def _course_map_normalized_for_grade(grade: str) -> dict[str, str]:
+def _course_map_index_for_grade(grade: str) -> dict[str, str]:
+    """Shared read-only normalised map for lookups on hot paths."""
     path = _course_map_path_for_grade(grade)
     if path:
-        return _parse_mapping(path)
+        return _mapping_index(path)
     return {}
 
+def _course_map_normalized_for_grade(grade: str) -> dict[str, str]:
+    return dict(_course_map_index_for_grade(grade))
+
 def _course_map_normalized_all() -> dict[str, str]:
     merged: dict[str, str] = {}
     for p in COURSE_MAP_PATHS.values():
-        merged.update(_parse_mapping(p))
+        merged.update(_mapping_index(p))
     return merged
 
-def _course_map_normalized_for_grade(grade: str) -> dict[str, str]:
-    path = _course_map_path_for_grade(grade)
-    if path:
-        return _parse_mapping(path)
-    return {}
-
 def _course_map_write_all(mapping: dict[str, str]) -> None:
     for p in COURSE_MAP_PATHS.values():
         _write_mapping_txt(p, mapping)
@@ -762,58 +1132,140 @@ def _load_seen_raw(path: str) -> list[str]:
     except Exception:
         return []
 
-def _save_seen_raw(path: str, arr: list[str]) -> None:
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(sorted(set(arr)), f, ensure_ascii=False, indent=2)
-    os.replace(tmp, path)
+def _save_seen_raw(path: str, arr) -> None:
+    atomic_write_json(path, sorted(set(arr)), indent=2)
 
-SEEN_SUBJECTS_RAW = _load_seen_raw(SEEN_SUB_RAW_PATH)
-SEEN_ROOMS_RAW    = _load_seen_raw(SEEN_ROOM_RAW_PATH)
-_last_seen_flush  = 0.0
+# New variants are noted in memory by request threads and appended to a shared journal by a
+# background thread; compaction folds the journal (every worker's additions) into the JSON files.
+SEEN_JOURNAL_PATH = os.path.join(DATA_DIR, "seen_raw.journal")
+SEEN_LOCK_PATH    = SEEN_JOURNAL_PATH + ".lock"
+SEEN_FLUSH_SEC    = max(1, int(os.environ.get("SEEN_FLUSH_SEC", "15")))
+SEEN_COMPACT_SEC  = max(1, int(os.environ.get("SEEN_COMPACT_SEC", "300")))
+_SEEN_FILES = {"subjects": SEEN_SUB_RAW_PATH, "rooms": SEEN_ROOM_RAW_PATH}
+
+def _read_seen_journal() -> dict[str, set[str]]:
+    """Variants per kind from the journal; lines are JSON [kind, raw]."""
+    out: dict[str, set[str]] = {kind: set() for kind in _SEEN_FILES}
+    try:
+        with open(SEEN_JOURNAL_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    kind, raw = json.loads(line)
+                except (ValueError, TypeError):
+                    continue  # torn tail of an interrupted append
+                if kind in out and isinstance(raw, str):
+                    out[kind].add(raw)
+    except FileNotFoundError:
+        pass
+    return out
+
+SEEN_SUBJECTS_RAW: set[str] = set(_load_seen_raw(SEEN_SUB_RAW_PATH))
+SEEN_ROOMS_RAW: set[str]    = set(_load_seen_raw(SEEN_ROOM_RAW_PATH))
+_SEEN = {"subjects": SEEN_SUBJECTS_RAW, "rooms": SEEN_ROOMS_RAW}
+for _kind, _values in _read_seen_journal().items():
+    _SEEN[_kind].update(_values)
+_seen_lock = threading.Lock()
+_seen_pending: list[tuple[str, str]] = []  # (kind, raw) not yet in the journal
+
+def _note_seen(kind: str, raw: str) -> None:
+    """Caller holds _seen_lock."""
+    values = _SEEN[kind]
+    if raw not in values:
+        values.add(raw)
+        _seen_pending.append((kind, raw))
+
+def _seen_snapshot(kind: str) -> list[str]:
+    with _seen_lock:
+        return sorted(_SEEN[kind])
 
 def record_seen_raw(lessons: list[dict]):
-    """Remember raw variants exactly as Untis sends them (for admin grouping)."""
-    global _last_seen_flush
-    changed = False
-    for L in lessons:
-        sraw = (L.get("subject_original") or L.get("subject") or "").strip()
-        rraw = (L.get("room") or "").strip()
-        if sraw and sraw not in SEEN_SUBJECTS_RAW:
-            SEEN_SUBJECTS_RAW.append(sraw); changed = True
-        if rraw and rraw not in SEEN_ROOMS_RAW:
-            SEEN_ROOMS_RAW.append(rraw); changed = True
-    now = time.time()
-    if changed and (now - _last_seen_flush > 15):
-        _save_seen_raw(SEEN_SUB_RAW_PATH, SEEN_SUBJECTS_RAW)
-        _save_seen_raw(SEEN_ROOM_RAW_PATH, SEEN_ROOMS_RAW)
-        _last_seen_flush = now
+    """Remember raw variants exactly as Untis sends them (for admin grouping). No file I/O."""
+    with _seen_lock:
+        for L in lessons:
+            sraw = (L.get("subject_original") or L.get("subject") or "").strip()
+            rraw = (L.get("room") or "").strip()
+            if sraw:
+                _note_seen("subjects", sraw)
+            if rraw:
+                _note_seen("rooms", rraw)
 
 def record_seen_rooms_from_exams(exams: list[dict]):
-    """Capture room variants from exams (manual or remote)."""
-    global _last_seen_flush
+    """Capture room variants from exams (manual or remote). No file I/O."""
     if not exams:
         return
-    changed = False
+    rooms = []
     for e in exams:
         if not isinstance(e, dict):
             continue
-        rooms = []
         if "rooms" in e:
             rlist = e.get("rooms")
             if isinstance(rlist, list):
                 rooms.extend([str(r or "").strip() for r in rlist])
         if "room" in e:
             rooms.extend(_split_rooms(e.get("room")))
+    with _seen_lock:
         for r in rooms:
             r = (r or "").strip()
-            if r and r not in SEEN_ROOMS_RAW:
-                SEEN_ROOMS_RAW.append(r)
-                changed = True
-    now = time.time()
-    if changed and (now - _last_seen_flush > 15):
-        _save_seen_raw(SEEN_ROOM_RAW_PATH, SEEN_ROOMS_RAW)
-        _last_seen_flush = now
+            if r:
+                _note_seen("rooms", r)
+
+def _flush_seen_journal() -> None:
+    """Append pending variants to the journal (one locked write)."""
+    with _seen_lock:
+        pending = _seen_pending[:]
+        _seen_pending.clear()
+    if not pending:
+        return
+    lines = "".join(json.dumps([kind, raw], ensure_ascii=False) + "\n" for kind, raw in pending)
+    try:
+        with file_lock(SEEN_LOCK_PATH):
+            with open(SEEN_JOURNAL_PATH, "a", encoding="utf-8") as f:
+                f.write(lines)
+    except Exception:
+        with _seen_lock:
+            _seen_pending[:0] = pending  # retry on the next flush
+        raise
+
+def _compact_seen() -> None:
+    """Fold the journal into the JSON files and adopt variants other workers recorded."""
+    merged: dict[str, set[str]] = {}
+    with file_lock(SEEN_LOCK_PATH):
+        journal = _read_seen_journal()
+        for kind, path in _SEEN_FILES.items():
+            merged[kind] = set(_load_seen_raw(path))
+            if journal[kind] - merged[kind]:
+                merged[kind] |= journal[kind]
+                _save_seen_raw(path, merged[kind])
+        if any(journal.values()):
+            open(SEEN_JOURNAL_PATH, "w").close()
+    with _seen_lock:
+        for kind, values in merged.items():
+            _SEEN[kind].update(values)
+
+_seen_worker_started = False
+
+def _start_seen_worker():
+    """Fire a daemon thread that journals new seen variants and compacts the journal."""
+    global _seen_worker_started
+    if _seen_worker_started:
+        return
+    _seen_worker_started = True
+    atexit.register(_flush_seen_journal)
+
+    def _worker():
+        last_compact = 0.0
+        while True:
+            time.sleep(SEEN_FLUSH_SEC)
+            try:
+                _flush_seen_journal()
+                if time.time() - last_compact >= SEEN_COMPACT_SEC:
+                    _compact_seen()
+                    last_compact = time.time()
+            except Exception as exc:
+                app.logger.warning("seen-variant flush failed: %s", exc)
+
+    t = threading.Thread(target=_worker, name="seen-flush", daemon=True)
+    t.start()
 
 def _group_variants(raw_list: list[str]) -> dict[str, list[str]]:
     """Return { normalised_key: [raw variants…] }."""
@@ -824,15 +1276,307 @@ def _group_variants(raw_list: list[str]) -> dict[str, list[str]]:
     return {k: sorted(v) for k, v in grouped.items()}
 
 # ---------- Timetable cache/throttle ----------
-_last_weekkey_ts: dict[str, float] = {}
-_last_weekkey_payload: dict[str, dict] = {}
+_flights = SingleFlight()  # coalesces identical in-flight Untis fetches
+
+def _make_payload_cache(name: str):
+    try:
+        return make_cache(name, CACHE_BACKEND, CACHE_PATH, CACHE_MAX_ENTRIES, CACHE_TTL_SEC)
+    except Exception as exc:
+        app.logger.warning("cache backend %s unavailable for %s, using memory: %s", CACHE_BACKEND, name, exc)
+        return make_cache(name, "memory", None, CACHE_MAX_ENTRIES, CACHE_TTL_SEC)
+
+_week_cache = _make_payload_cache("timetable")
+# encoded/compressed bodies keyed by payload ETag; per process, whatever the payload backend
+_body_cache = make_cache("bodies", "memory", None, CACHE_MAX_ENTRIES * 2, CACHE_TTL_SEC)
 
 def _week_key(ws: date) -> str:
     return ws.isoformat()
 
+def _cache_put(cache, key: str, payload: dict, ttl: float | None = None) -> str:
+    """Store payload together with its precomputed ETag; returns the ETag."""
+    etag = _payload_etag(payload)
+    cache.set(key, {"payload": payload, "etag": etag}, ttl=ttl)
+    # timetable payloads are served through _with_current_settings: pre-render under that ETag
+    body_etag = _settings_etag(etag, payload["settings"]) if "settings" in payload else etag
+    if _body_cache.get(body_etag, record=False) is None:
+        _body_cache.set(body_etag, _render_payload(payload))
+    return etag
+
+def _cache_get(cache, key: str, record: bool = True):
+    """Return (payload, etag, stored_at) or None."""
+    entry = cache.get(key, record=record)
+    if entry is None:
+        return None
+    value, stored_at = entry
+    if not isinstance(value, dict) or "payload" not in value:
+        return None  # entry written by an older version
+    return value["payload"], value.get("etag") or _payload_etag(value["payload"]), stored_at
+
+def _store_week_payload(weekkey: str, payload: dict) -> None:
+    _cache_put(_week_cache, weekkey, payload)
+
+def _payload_failed(payload: dict) -> bool:
+    """True for payloads built while Untis failed (ok=False, per-grade errors, exam warnings)."""
+    return not payload.get("ok") or bool(payload.get("errors") or payload.get("warnings"))
+
+def _store_fetched(cache, key: str, payload: dict) -> dict:
+    """
+    Cache a freshly fetched payload and return the one to serve. A failed fetch never
+    replaces a good entry: that entry stays (and is returned) until a later revalidation
+    succeeds. Without a good entry the failure is cached for CACHE_FAILED_SEC only.
+    """
+    if not _payload_failed(payload):
+        _cache_put(cache, key, payload)
+        return payload
+    entry = _cache_get(cache, key, record=False)
+    if entry is not None and not _payload_failed(entry[0]):
+        app.logger.warning("refetch of %s %s failed, keeping the cached payload", cache.name, key)
+        return entry[0]
+    _cache_put(cache, key, payload, ttl=CACHE_FAILED_SEC)
+    return payload
+
+def _cached_payload(cache, key: str, max_age: float | None = None, record: bool = True) -> dict | None:
+    """Cached payload for key, or None when missing or older than max_age seconds."""
+    entry = _cache_get(cache, key, record=record)
+    if entry is None:
+        return None
+    payload, _etag, stored_at = entry
+    if max_age is not None and (time.time() - stored_at) >= max_age:
+        return None
+    return payload
+
+# ---------- Freshness policy ----------
+def _parse_hours(raw: str, default: str) -> tuple[int, int]:
+    """'HH:MM-HH:MM' -> (start, end) in minutes after midnight; invalid raw falls back to default."""
+    for value in (raw, default):
+        try:
+            start, end = (datetime.strptime(part.strip(), "%H:%M") for part in value.split("-"))
+            return start.hour * 60 + start.minute, end.hour * 60 + end.minute
+        except ValueError:
+            app.logger.warning("ignoring invalid freshness hours %r (expected HH:MM-HH:MM)", value)
+    raise RuntimeError(f"freshness hours {raw!r} and default {default!r} must be HH:MM-HH:MM.")
+
+_PEAK_MINUTES = _parse_hours(FRESH_PEAK_HOURS, "06:30-08:30")
+_DAY_MINUTES = _parse_hours(FRESH_DAY_HOURS, "06:00-16:00")
+_FRESH_TTL = {"peak": FRESH_PEAK_SEC, "day": CACHE_STALE_SEC, "off": FRESH_OFF_SEC}
+
+def _freshness_period(now: datetime | None = None) -> str:
+    """'peak', 'day' or 'off' for now in APP_TZ; weekends and vacation days are off."""
+    now = now or datetime.now(APP_TZ)
+    today = now.date()
+    if today.weekday() >= 5 or _vacation_covering(today, today):
+        return "off"
+    minute = now.hour * 60 + now.minute
+    if _PEAK_MINUTES[0] <= minute < _PEAK_MINUTES[1]:
+        return "peak"
+    if _DAY_MINUTES[0] <= minute < _DAY_MINUTES[1]:
+        return "day"
+    return "off"
+
+def _freshness_sec(target: date | None = None) -> float:
+    """Seconds a cached payload stays fresh; target is the week/range start it covers."""
+    now = datetime.now(APP_TZ)
+    ttl = _FRESH_TTL[_freshness_period(now)]
+    if target is not None:
+        this_week = _monday_of(now.date())
+        if target < this_week or target >= this_week + timedelta(days=7 * FRESH_FAR_WEEKS):
+            ttl = max(ttl, FRESH_FAR_SEC)
+    return ttl
+
+def _refresh_delay() -> float:
+    """Background refresher pause: REFRESH_INTERVAL_SEC in school hours, scaled with the current TTL."""
+    scaled = REFRESH_INTERVAL_SEC * _freshness_sec() / max(1, CACHE_STALE_SEC)
+    return max(REFRESH_INTERVAL_SEC / 4, min(scaled, max(REFRESH_INTERVAL_SEC, FRESH_OFF_SEC)))
+
+def _week_cached_fresh(weekkey: str, max_age: float | None = None) -> bool:
+    if max_age is None:
+        max_age = _freshness_sec(date.fromisoformat(weekkey))
+    return _cached_payload(_week_cache, weekkey, max_age, record=False) is not None
+
+_bg_lock = threading.Lock()
+_bg_running: set[str] = set()
+_bg_retry_at: dict[str, float] = {}  # revalidation key -> earliest retry after a failed revalidation
+
+def _run_in_background(key: str, fn, name: str) -> bool:
+    """Run fn() in a daemon thread with an app context unless the same key is already running."""
+    with _bg_lock:
+        if key in _bg_running:
+            return False
+        _bg_running.add(key)
+
+    def _worker():
+        try:
+            with app.app_context():
+                fn()
+        except Exception as exc:
+            app.logger.warning("%s failed: %s", name, exc)
+        finally:
+            with _bg_lock:
+                _bg_running.discard(key)
+
+    threading.Thread(target=_worker, name=name, daemon=True).start()
+    return True
+
+# ---------- Forced-refresh policy ----------
+_force_lock = threading.Lock()
+_force_history: dict[str, list[float]] = {}
+
+def _consume_force_token() -> bool:
+    """Per-session sliding-window limit for honoured force=1 requests."""
+    user_id = _current_user_id()
+    ident = f"user:{user_id}" if user_id is not None else f"ip:{request.remote_addr}"
+    now = time.time()
+    with _force_lock:
+        recent = [t for t in _force_history.get(ident, []) if now - t < 60]
+        allowed = len(recent) < FORCE_RATE_PER_MIN
+        if allowed:
+            recent.append(now)
+        _force_history[ident] = recent
+        if len(_force_history) > 4096:
+            for k in [k for k, v in _force_history.items() if not v or now - v[-1] >= 60]:
+                _force_history.pop(k, None)
+    return allowed
+
+def _force_allowed(age: float) -> bool:
+    """May this force=1 request bypass a cache entry that is age seconds old? Admins always may."""
+    if _require_admin():
+        return True
+    if age < FORCE_MIN_INTERVAL_SEC:
+        return False
+    return _consume_force_token()
+
+def _cached_for_request(cache, key: str, force: bool, revalidate, name: str, stale_after: float = CACHE_STALE_SEC):
+    """
+    Return (payload, etag, age) if the request can be answered from cache, else None.
+    Entries older than stale_after seconds are revalidated in the background (after a failed
+    revalidation not again for CACHE_FAILED_SEC); force=1 only bypasses the cache when the
+    forced-refresh policy allows it.
+    """
+    entry = _cache_get(cache, key)
+    if entry is None:
+        return None
+    payload, etag, stored_at = entry
+    age = max(0.0, time.time() - stored_at)
+    if force and _force_allowed(age):
+        return None
+    bg_key = f"{name}:{key}"
+    with _bg_lock:
+        retry_at = _bg_retry_at.get(bg_key, 0.0)
+    if age >= stale_after and time.time() >= retry_at:
+        _run_in_background(bg_key, lambda: _revalidate_entry(cache, key, stored_at, revalidate, bg_key),
+                           f"{name}-revalidate")
+    return payload, etag, age
+
+def _revalidate_entry(cache, key: str, stored_at: float, revalidate, bg_key: str) -> None:
+    """Run revalidate(); when it left the entry untouched (Untis failed), back off CACHE_FAILED_SEC."""
+    try:
+        revalidate()
+    finally:
+        entry = _cache_get(cache, key, record=False)
+        with _bg_lock:
+            if entry is not None and entry[2] > stored_at:
+                _bg_retry_at.pop(bg_key, None)
+            else:
+                _bg_retry_at[bg_key] = time.time() + CACHE_FAILED_SEC
+
+def _with_age(resp, age: float, force_denied: bool = False):
+    """Tell clients how old cached data is (and when their force=1 was not honoured)."""
+    resp.headers["Age"] = str(int(age))
+    if force_denied:
+        resp.headers["X-Force-Refresh"] = "throttled"
+    return resp
+
+def _refresh_week(ws: date) -> dict:
+    """Fetch ws from Untis into the cache; concurrent callers share one upstream fetch."""
+    payload, _shared = _flights.do(f"week:{_week_key(ws)}", lambda: _fetch_week_payload(ws))
+    return payload
+
+def _prefetch_weeks(first_ws: date, count: int) -> int:
+    """Fill the week cache for count weeks from first_ws with one range fetch per grade.
+
+    Weeks are only cached when every grade answered, so a failing login never
+    hides behind a prefetched payload. Returns the number of weeks handled
+    (cached or covered by a vacation).
+    """
+    if count <= 0:
+        return 0
+    # weeks inside a vacation are answered from the vacation index, never fetched
+    weeks = [first_ws + timedelta(days=7 * i) for i in range(count)]
+    weeks = [ws for ws in weeks if _vacation_covering(ws, ws + timedelta(days=6)) is None]
+    if not weeks:
+        return count
+    grades = available_grades() or ["EF"]
+    results = run_per_grade(lambda client: client.fetch_range(weeks[0], weeks[-1] + timedelta(days=6)), grades)
+    if any(isinstance(res, Exception) for res in results.values()):
+        return 0
+    settings_payload, banner_payload = _timetable_settings()
+    for ws in weeks:
+        lessons: list[dict] = []
+        for grade in grades:
+            for L in results[grade].get(ws, []):
+                L["grade"] = grade
+                lessons.append(L)
+        record_seen_raw(lessons)
+        payload = _timetable_payload(ws, lessons, grades, [], settings_payload, banner_payload)
+        _store_week_payload(_week_key(ws), payload)
+        save_last_good({**payload, "_cachedAt": time.time()})
+        _freeze_week(ws, {grade: results[grade].get(ws, []) for grade in grades})
+    return count
+
+def _start_prefetch(first_ws: date, count: int) -> None:
+    """Run _prefetch_weeks in a daemon thread unless the same range is already in flight."""
+    key = f"prefetch:{first_ws.isoformat()}+{count}"
+    _run_in_background(key, lambda: _prefetch_weeks(first_ws, count), "week-prefetch")
+
+# ---------- Archive of ended weeks ----------
+# Once a week is over, each grade's lessons are frozen in ARCHIVE_PATH; requests for
+# archived weeks are answered from there with long-lived cache headers and never reach Untis.
+ARCHIVE = TimetableArchive(ARCHIVE_PATH)
+# assembled archive payloads; short TTL so settings/banner edits still show up
+_archive_cache = make_cache("archive", "memory", None, CACHE_MAX_ENTRIES, 300)
+
+def _week_ended(ws: date) -> bool:
+    return ws + timedelta(days=7) <= datetime.now(APP_TZ).date()
+
+def _freeze_week(ws: date, by_grade: dict[str, list[dict]]) -> None:
+    """Archive the given grades of ws once the week is over; failures are only logged."""
+    if not by_grade or not _week_ended(ws):
+        return
+    try:
+        ARCHIVE.put_many(ws, by_grade)
+    except Exception as exc:
+        app.logger.warning("archiving week %s failed: %s", ws, exc)
+        return
+    _archive_cache.delete(_week_key(ws))
+
+def _vacation_week_payload(ws: date) -> dict | None:
+    """Empty timetable payload tagged with the vacation title when ws lies entirely inside one."""
+    title = _vacation_covering(ws, ws + timedelta(days=6))
+    if title is None:
+        return None
+    settings_payload, banner_payload = _timetable_settings()
+    grades = available_grades() or ["EF"]
+    return {**_timetable_payload(ws, [], grades, [], settings_payload, banner_payload), "vacation": title}
+
+def _archived_week(ws: date) -> tuple[dict, str] | None:
+    """(payload, etag) when every available grade of ws is archived, else None."""
+    if not _week_ended(ws):
+        return None
+    weekkey = _week_key(ws)
+    hit = _cache_get(_archive_cache, weekkey)
+    if hit is not None:
+        return hit[0], hit[1]
+    grades = available_grades() or ["EF"]
+    by_grade = ARCHIVE.get_week(ws, grades)
+    if by_grade is None:
+        return None
+    lessons = [L for grade in grades for L in by_grade[grade]]
+    settings_payload, banner_payload = _timetable_settings()
+    payload = {**_timetable_payload(ws, lessons, grades, [], settings_payload, banner_payload), "archived": True}
+    return payload, _cache_put(_archive_cache, weekkey, payload)
+
 # ---------- Exams cache/throttle ----------
-_last_exam_key_ts: dict[str, float] = {}
-_last_exam_payload: dict[str, dict] = {}
+_exam_cache = _make_payload_cache("exams")
 
 def _exam_key(start: date, end: date, exam_type: int, grades: list[str] | tuple[str, ...] | None = None) -> str:
     grade_part = "ALL"
@@ -926,6 +1670,9 @@ def _load_manual_exams(start: date, end: date) -> list[dict]:
 # ---------------- Routes ----------------
 @app.after_request
 def add_no_cache(resp):
+    # ETag responses set their own revalidation policy (see _cached_json_response)
+    if resp.headers.get("ETag"):
+        return resp
     return _no_store(resp)
 
 @app.route("/")
@@ -939,9 +1686,11 @@ def service_worker():
 
 @app.route("/api/mappings")
 def api_mappings():
-    course_map = _course_map_normalized_all()
-    room_map   = _parse_mapping(ROOM_MAP_PATH)
-    return _no_store(jsonify({"ok": True, "courses": course_map, "rooms": room_map}))
+    paths = [*COURSE_MAP_PATHS.values(), ROOM_MAP_PATH]
+    return _stamped_json_response(
+        ("mappings", [_file_signature(p) for p in paths]),
+        lambda: {"ok": True, "courses": _course_map_normalized_all(), "rooms": _mapping_index(ROOM_MAP_PATH)},
+    )
 
 @app.route("/api/courses")
 def api_courses():
@@ -973,13 +1722,19 @@ def api_courses():
                 opts.setdefault(nk, label)
         return opts
 
+    def _build() -> dict:
+        items: list[dict] = []
+        for grade in grades:
+            grade_opts = _options_for_grade(grade)
+            for key in sorted(grade_opts.keys(), key=lambda k: (grade_opts[k].lower(), grade_opts[k])):
+                items.append({"key": f"{grade}:{key}", "label": grade_opts[key], "grade": grade})
+        return {"ok": True, "courses": items}
+
     grades = available_grades() or ["EF"]
-    items: list[dict] = []
-    for grade in grades:
-        grade_opts = _options_for_grade(grade)
-        for key in sorted(grade_opts.keys(), key=lambda k: (grade_opts[k].lower(), grade_opts[k])):
-            items.append({"key": f"{grade}:{key}", "label": grade_opts[key], "grade": grade})
-    return _no_store(jsonify({"ok": True, "courses": items}))
+    # options come from the grade's mapping file plus its recorded raw subjects
+    sources = [(_course_map_path_for_grade(g), os.path.join(DATA_DIR, f"subjects_raw_{g.lower()}.txt")) for g in grades]
+    stamp = ("courses", grades, [(_file_signature(m) if m else None, _file_signature(r)) for m, r in sources])
+    return _stamped_json_response(stamp, _build)
 
 @app.route("/api/health")
 def api_health():
@@ -996,58 +1751,118 @@ def api_timetable():
         return _api_timetable_impl()
     except Exception as exc:
         app.logger.exception("timetable failed")
-        # Fallback to last good payload if available
-        if LAST_GOOD:
-            fallback = dict(LAST_GOOD)
+        # Fallback to the last good payload of the requested week if available
+        ws = _requested_week_start()
+        last_good = load_last_good(_week_key(ws)) if ws else None
+        if last_good:
+            fallback = dict(last_good)
             fallback["ok"] = True
             fallback["error"] = f"served cached timetable because of: {exc}"
             return _no_store(jsonify(fallback))
         return jsonify({"ok": False, "error": "timetable_failed"}), 500
 
+def _requested_week_start() -> date | None:
+    """weekStart query arg (default: _default_week_start()); None when malformed."""
+    qs = request.args.get("weekStart")
+    if not qs:
+        return _default_week_start()
+    try:
+        return datetime.strptime(qs, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
 def _api_timetable_impl():
     # week selection
-    qs = request.args.get("weekStart")
-    if qs:
-        try:
-            ws = datetime.strptime(qs, "%Y-%m-%d").date()
-        except ValueError:
-            return jsonify({"ok": False, "error": "bad weekStart; use YYYY-MM-DD"}), 400
-    else:
-        today = datetime.now(APP_TZ).date()
-        ws = _monday_of(today) + (timedelta(days=7) if today.weekday() in (5, 6) else timedelta(0))
+    ws = _requested_week_start()
+    if ws is None:
+        return jsonify({"ok": False, "error": "bad weekStart; use YYYY-MM-DD"}), 400
 
     weekkey = _week_key(ws)
     debug   = request.args.get("debug") == "1"
     force   = request.args.get("force") == "1" or debug
 
-    # throttle Untis calls for 15s per week unless forced
-    now_ts = time.time()
-    if not force and weekkey in _last_weekkey_payload and (now_ts - _last_weekkey_ts.get(weekkey, 0)) < 15:
-        return _no_store(jsonify(_last_weekkey_payload[weekkey]))
+    # vacation weeks need no Untis at all; edit the vacations to get lessons back
+    vacation = _vacation_week_payload(ws)
+    if vacation is not None:
+        return _with_age(_cached_json_response(vacation), 0.0)
 
-    raw_width = _get_setting("timeColumnWidth", SETTINGS_DEFAULTS["timeColumnWidth"])
-    try:
-        width_value = int(float(raw_width))
-    except (TypeError, ValueError):
-        width_value = int(SETTINGS_DEFAULTS["timeColumnWidth"])
-    width_value = max(40, min(120, width_value))
-    banner_payload = _update_banner_payload()
-    settings_payload = {
-        "timeColumnWidth": width_value,
-        "updateBanner": banner_payload,
-    }
+    # ended weeks come from the archive; only an admin force=1 refetches (and refreezes) them
+    archived = None if force and _require_admin() else _archived_week(ws)
+    if archived is not None:
+        hit = (*archived, 0.0)
+    else:
+        # answer from cache whenever possible (stale entries are revalidated off the request thread);
+        # force=1 only reaches Untis when the forced-refresh policy allows it
+        hit = _cached_for_request(_week_cache, weekkey, force, lambda: _refresh_week(ws), "week",
+                                  stale_after=_freshness_sec(ws))
+    if hit is not None:
+        payload, etag, age = hit
+    else:
+        # cold miss (or honoured force): fetch now; concurrent requests share one upstream fetch
+        payload, etag, age = _refresh_week(ws), None, 0.0
+        if payload.get("ok"):
+            # page-ahead: warm the following weeks with one range fetch per grade
+            next_ws = ws + timedelta(days=7)
+            if PREFETCH_WEEKS > 0 and not payload.get("errors") and not _week_cached_fresh(_week_key(next_ws)):
+                _start_prefetch(next_ws, PREFETCH_WEEKS)
+    payload, etag = _with_current_settings(payload, etag)
+
+    # optionally enrich with debug mapping fields (on copies; the cache stays clean)
+    if debug and payload.get("ok"):
+        # per-lesson mapping lookup by its grade to avoid cross mixing
+        rmap = _mapping_index(ROOM_MAP_PATH)
+        cmaps: dict[str, dict[str, str]] = {}
+        lessons = [dict(L) for L in payload.get("lessons") or []]
+        for L in lessons:
+            sr = (L.get("subject_original") or L.get("subject") or "")
+            rr = (L.get("room") or "")
+            sn = norm_key(sr); rn = norm_key(rr)
+            grade = L.get("grade")
+            cmap = cmaps.get(grade)
+            if cmap is None:
+                cmap = cmaps[grade] = _course_map_index_for_grade(grade)
+            L["debug"] = {
+                "subject_raw": sr, "subject_norm": sn, "mapped_subject": cmap.get(sn),
+                "room_raw": rr,    "room_norm": rn,    "mapped_room": rmap.get(rn),
+                "server_now": datetime.now(APP_TZ).isoformat(), "week_start": ws.isoformat()
+            }
+        payload = {**payload, "lessons": lessons}
+        return _with_age(_no_store(jsonify(payload)), age)
+    resp = _with_age(_cached_json_response(payload, etag), age, force_denied=force and hit is not None)
+    if archived is not None:
+        resp.headers["Cache-Control"] = f"private, max-age={ARCHIVE_MAX_AGE_SEC}, immutable"
+    return resp
+
+def _default_week_start() -> date:
+    """Monday of the current week; on weekends the upcoming week."""
+    today = datetime.now(APP_TZ).date()
+    return _monday_of(today) + (timedelta(days=7) if today.weekday() in (5, 6) else timedelta(0))
+
+def _fetch_week_payload(ws: date) -> dict:
+    """Fetch ws for all grades from Untis, store the payload in the week cache and return it."""
+    vacation = _vacation_week_payload(ws)
+    if vacation is not None:
+        return vacation  # not cached: removing the vacation takes effect immediately
+    weekkey = _week_key(ws)
+    settings_payload, banner_payload = _timetable_settings()
 
     lessons: list[dict] = []
     errors: list[str] = []
+    fetched: dict[str, list[dict]] = {}  # grades Untis answered for (archive candidates)
     grades = available_grades()
     if not grades:
         grades = ["EF"]
+    # all grades are fetched in parallel; failures stay per grade
+    results = fetch_week_many(ws, grades)
     for grade in grades:
         try:
-            grade_lessons = fetch_week(ws, grade)
+            grade_lessons = results[grade]
+            if isinstance(grade_lessons, Exception):
+                raise grade_lessons
             for L in grade_lessons:
                 L["grade"] = grade
             lessons.extend(grade_lessons)
+            fetched[grade] = grade_lessons
         except Exception as e:
             msg = f"{grade}: {e}"
             errors.append(msg)
@@ -1056,6 +1871,7 @@ def _api_timetable_impl():
             if cached:
                 lessons.extend(cached)
                 errors[-1] = msg + " (served cached lessons)"
+    _freeze_week(ws, fetched)
 
     if errors and not lessons:
         payload = {
@@ -1064,31 +1880,51 @@ def _api_timetable_impl():
             "lessons": [],
             "error": "; ".join(errors),
             "settings": settings_payload,
+            "updateBanner": banner_payload,
             "grades": grades,
         }
-        _last_weekkey_payload[weekkey] = payload
-        _last_weekkey_ts[weekkey] = time.time()
-        return _no_store(jsonify(payload))
+        return _store_fetched(_week_cache, weekkey, payload)
 
     # remember raw variants for admin UI
     record_seen_raw(lessons)
 
-    # optionally enrich with debug mapping fields
-    if debug:
-        # per-lesson mapping lookup by its grade to avoid cross mixing
-        rmap = _parse_mapping(ROOM_MAP_PATH)
-        for L in lessons:
-            sr = (L.get("subject_original") or L.get("subject") or "")
-            rr = (L.get("room") or "")
-            sn = norm_key(sr); rn = norm_key(rr)
-            cmap = _course_map_normalized_for_grade(L.get("grade"))
-            L["debug"] = {
-                "subject_raw": sr, "subject_norm": sn, "mapped_subject": cmap.get(sn),
-                "room_raw": rr,    "room_norm": rn,    "mapped_room": rmap.get(rn),
-                "server_now": datetime.now(APP_TZ).isoformat(), "week_start": ws.isoformat()
-            }
+    payload = _timetable_payload(ws, lessons, grades, errors, settings_payload, banner_payload)
+    if not errors:
+        save_last_good({**payload, "_cachedAt": time.time()})
+    return _store_fetched(_week_cache, weekkey, payload)
 
-    payload = {
+def _timetable_settings() -> tuple[dict, dict | None]:
+    """Return (settings block, update banner) embedded in timetable payloads."""
+    raw_width = _get_setting("timeColumnWidth", SETTINGS_DEFAULTS["timeColumnWidth"])
+    try:
+        width_value = int(float(raw_width))
+    except (TypeError, ValueError):
+        width_value = int(SETTINGS_DEFAULTS["timeColumnWidth"])
+    width_value = max(40, min(120, width_value))
+    banner_payload = _update_banner_payload()
+    settings_payload = {
+        "timeColumnWidth": width_value,
+        "updateBanner": banner_payload,
+    }
+    return settings_payload, banner_payload
+
+def _settings_etag(etag: str, settings_payload: dict) -> str:
+    raw = repr((etag, settings_payload))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+def _with_current_settings(payload: dict, etag: str | None = None) -> tuple[dict, str]:
+    """
+    (payload, etag) with today's settings block and update banner. Cached and archived
+    payloads keep the settings of their fetch; merging here makes admin edits (in any
+    worker) visible at once, and the ETag changes with them.
+    """
+    settings_payload, banner_payload = _timetable_settings()
+    merged = {**payload, "settings": settings_payload, "updateBanner": banner_payload}
+    return merged, _settings_etag(etag or _payload_etag(payload), settings_payload)
+
+def _timetable_payload(ws: date, lessons: list[dict], grades: list[str], errors: list[str],
+                       settings_payload: dict, banner_payload: dict | None) -> dict:
+    return {
         "ok": True,
         "weekStart": str(ws),
         "lessons": lessons,
@@ -1097,10 +1933,6 @@ def _api_timetable_impl():
         "grades": grades,
         "errors": errors if errors else [],
     }
-    _last_weekkey_payload[weekkey] = payload
-    _last_weekkey_ts[weekkey] = time.time()
-    save_last_good({**payload, "_cachedAt": time.time()})
-    return _no_store(jsonify(payload))
 
 @app.route("/api/exams")
 def api_exams():
@@ -1143,10 +1975,24 @@ def api_exams():
         grades = available
 
     cache_key = _exam_key(start, end, exam_type, grades)
-    now_ts = time.time()
-    if not force and cache_key in _last_exam_payload and (now_ts - _last_exam_key_ts.get(cache_key, 0)) < 15:
-        return _no_store(jsonify(_last_exam_payload[cache_key]))
+    # answer from cache whenever possible; force=1 is subject to the forced-refresh policy
+    hit = _cached_for_request(_exam_cache, cache_key, force,
+                              lambda: _refresh_exams(start, end, exam_type, grades), "exams",
+                              stale_after=_freshness_sec(min(max(start, today), end)))
+    if hit is not None:
+        payload, etag, age = hit
+        return _with_age(_cached_json_response(payload, etag), age, force_denied=force)
+    return _with_age(_cached_json_response(_refresh_exams(start, end, exam_type, grades)), 0)
+
+def _refresh_exams(start: date, end: date, exam_type: int, grades: list[str]) -> dict:
+    """Fetch exams into the cache; concurrent requests for the same range and grades share one fetch."""
+    key = _exam_key(start, end, exam_type, grades)
+    payload, _shared = _flights.do(f"exams:{key}", lambda: _fetch_exam_payload(start, end, exam_type, grades))
+    return payload
 
+def _fetch_exam_payload(start: date, end: date, exam_type: int, grades: list[str]) -> dict:
+    """Load manual and Untis exams for the range, store the payload in the exam cache and return it."""
+    cache_key = _exam_key(start, end, exam_type, grades)
     manual_exams: list[dict] = []
     try:
         manual_exams = _load_manual_exams(start, end)
@@ -1214,12 +2060,15 @@ def api_exams():
     fetch_failed = False
     permission_denied = False
 
-    for grade in grades:
+    # no Untis exams inside a vacation; manual exams are still listed
+    vacation = _vacation_covering(start, end)
+    for grade in ([] if vacation else grades):
         try:
-            raw_exams = fetch_exams(start, end, exam_type, grade) or []
-            subjects  = fetch_subject_map(grade)
-            classes   = fetch_class_map(grade)
-            teachers  = fetch_teacher_map(grade)
+            raw_exams, lookups = fetch_exams_bundle(start, end, exam_type, grade)
+            raw_exams = raw_exams or []
+            subjects  = lookups["subjects"]
+            classes   = lookups["classes"]
+            teachers  = lookups["teachers"]
         except Exception as e:
             msg = str(e)
             fetch_failed = True
@@ -1250,6 +2099,8 @@ def api_exams():
         "grades": grades,
         "exams": exams,
     }
+    if vacation:
+        payload["vacation"] = vacation
     if warnings:
         payload["warning"] = "; ".join(warnings)
         payload["warnings"] = warnings
@@ -1257,26 +2108,30 @@ def api_exams():
             payload["errorCode"] = "exam_permission_denied"
         elif fetch_failed:
             payload["errorCode"] = "exam_fetch_failed"
-    _last_exam_payload[cache_key] = payload
-    _last_exam_key_ts[cache_key] = time.time()
-    return _no_store(jsonify(payload))
+    return _store_fetched(_exam_cache, cache_key, payload)
 
 @app.route("/api/vacations")
 def api_vacations():
-    db = get_db()
-    cur = db.execute(
-        "SELECT id, title, start_date, end_date FROM vacations ORDER BY start_date, title"
-    )
-    rows = [
-        {
-            "id": row["id"],
-            "title": row["title"],
-            "start_date": row["start_date"],
-            "end_date": row["end_date"],
-        }
-        for row in cur.fetchall()
-    ]
-    return _no_store(jsonify({"ok": True, "vacations": rows}))
+    def _build() -> dict:
+        cur = get_db().execute(
+            "SELECT id, title, start_date, end_date FROM vacations ORDER BY start_date, title"
+        )
+        rows = [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "start_date": row["start_date"],
+                "end_date": row["end_date"],
+            }
+            for row in cur.fetchall()
+        ]
+        return {"ok": True, "vacations": rows}
+
+    stamp = _file_signature(VACATIONS_STAMP_PATH)
+    if stamp is None:  # DB from before the stamp existed: create it so the ETag is meaningful
+        _invalidate_vacations()
+        stamp = _file_signature(VACATIONS_STAMP_PATH)
+    return _stamped_json_response(("vacations", DB_PATH, stamp), _build)
 
 def _auth_response(row):
     profile = _load_profile_for_user(row) if row else _empty_profile()
@@ -1395,106 +2250,251 @@ def admin_mappings():
     return render_template("admin_mappings.html")
 
 # ---- Admin APIs ----
-def _build_backup_payload() -> dict:
-    """Collect all editable data so admins can download a single backup file."""
-    db = get_db()
-    users = []
-    try:
-        cur = db.execute(
-            "SELECT id, username, password_hash, password_plain, profile_json, created_at FROM users ORDER BY id"
-        )
-        for row in cur.fetchall():
-            prof = _load_profile_for_user(row)
-            users.append({
-                "id": row["id"],
-                "username": row["username"],
-                "password_hash": row["password_hash"],
-                "password_plain": row["password_plain"],
-                "profile": prof,
-                "created_at": row["created_at"],
-            })
-    except Exception:
-        users = []
+# Backups exist as one JSON document (download, webhook) and as NDJSON records, one per line:
+# {"section": "meta"|"settings"|"mappings"|"seen", "data": {...}} or {"section": <table>, "row": {...}}.
+# The NDJSON form is produced and restored row by row, so memory stays flat as users grow.
+def _backup_user_row(row) -> dict:
+    return {
+        "id": row["id"],
+        "username": row["username"],
+        "password_hash": row["password_hash"],
+        "password_plain": row["password_plain"],
+        "profile": _load_profile_for_user(row),
+        "created_at": row["created_at"],
+    }
 
-    vacations = []
-    try:
-        cur = db.execute(
-            "SELECT id, title, start_date, end_date, created_at FROM vacations ORDER BY start_date, id"
-        )
-        for row in cur.fetchall():
-            vacations.append({
-                "id": row["id"],
-                "title": row["title"],
-                "start_date": row["start_date"],
-                "end_date": row["end_date"],
-                "created_at": row["created_at"],
-            })
-    except Exception:
-        vacations = []
+def _backup_vacation_row(row) -> dict:
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "start_date": row["start_date"],
+        "end_date": row["end_date"],
+        "created_at": row["created_at"],
+    }
 
-    exams_manual = []
+def _backup_exam_row(row) -> dict:
+    return {
+        "id": row["id"],
+        "subject": row["subject"],
+        "name": row["name"],
+        "date": row["date"],
+        "start_time": row["start_time"],
+        "end_time": row["end_time"],
+        "classes": json.loads(row["classes_json"] or "[]"),
+        "teachers": json.loads(row["teachers_json"] or "[]"),
+        "room": row["room"],
+        "note": row["note"],
+        "grade": str(row["grade"] if "grade" in row.keys() else "").strip().upper(),
+        "created_at": row["created_at"],
+    }
+
+_BACKUP_QUERIES = {
+    "users": ("SELECT id, username, password_hash, password_plain, profile_json, created_at FROM users ORDER BY id",
+              _backup_user_row),
+    "vacations": ("SELECT id, title, start_date, end_date, created_at FROM vacations ORDER BY start_date, id",
+                  _backup_vacation_row),
+    "exams_manual": ("SELECT id, subject, name, date, start_time, end_time, classes_json, teachers_json, room, note, grade, created_at FROM exams_manual ORDER BY date, start_time, id",
+                     _backup_exam_row),
+}
+
+def _iter_backup_rows(table: str):
+    """Rows of one table in backup format, fetched BACKUP_BATCH_ROWS at a time."""
+    sql, to_dict = _BACKUP_QUERIES[table]
     try:
-        cur = db.execute(
-            "SELECT id, subject, name, date, start_time, end_time, classes_json, teachers_json, room, note, grade, created_at FROM exams_manual ORDER BY date, start_time, id"
-        )
-        for row in cur.fetchall():
-            exams_manual.append({
-                "id": row["id"],
-                "subject": row["subject"],
-                "name": row["name"],
-                "date": row["date"],
-                "start_time": row["start_time"],
-                "end_time": row["end_time"],
-                "classes": json.loads(row["classes_json"] or "[]"),
-                "teachers": json.loads(row["teachers_json"] or "[]"),
-                "room": row["room"],
-                "note": row["note"],
-                "grade": str(row["grade"] if "grade" in row.keys() else "").strip().upper(),
-                "created_at": row["created_at"],
-            })
-    except Exception:
-        exams_manual = []
+        cur = get_db().execute(sql)
+        while True:
+            rows = cur.fetchmany(BACKUP_BATCH_ROWS)
+            if not rows:
+                return
+            for row in rows:
+                yield to_dict(row)
+    except Exception as exc:
+        app.logger.warning("backup export of %s failed: %s", table, exc)
 
+def _backup_settings() -> dict:
     settings_map = {}
     try:
-        cur = db.execute("SELECT key, value FROM settings")
+        cur = get_db().execute("SELECT key, value FROM settings")
         for row in cur.fetchall():
             settings_map[row["key"]] = row["value"]
     except Exception:
         settings_map = {}
     for key, default in SETTINGS_DEFAULTS.items():
         settings_map.setdefault(key, default)
+    return settings_map
 
-    payload = {
-        "meta": {
-            "version": BACKUP_VERSION,
-            "exported_at": datetime.now(APP_TZ).isoformat(),
-        },
+def _backup_mappings() -> dict:
+    return {
+        # keep legacy merged view plus grade-specific maps for clarity
+        "courses": _course_map_normalized_all(),
+        "courses_ef": _course_map_normalized_for_grade("EF"),
+        "courses_q1": _course_map_normalized_for_grade("Q1"),
+        "rooms": _parse_mapping(ROOM_MAP_PATH),
+    }
+
+def _backup_seen() -> dict:
+    return {
+        "subjects_raw": _seen_snapshot("subjects"),
+        "rooms_raw": _seen_snapshot("rooms"),
+    }
+
+def _backup_meta() -> dict:
+    return {
+        "version": BACKUP_VERSION,
+        "exported_at": datetime.now(APP_TZ).isoformat(),
+    }
+
+def _build_backup_payload() -> dict:
+    """Collect all editable data so admins can download a single backup file."""
+    return {
+        "meta": _backup_meta(),
         "database": {
-            "users": users,
-            "vacations": vacations,
-            "exams_manual": exams_manual,
-            "settings": settings_map,
-        },
-        "mappings": {
-            # keep legacy merged view plus grade-specific maps for clarity
-            "courses": _course_map_normalized_all(),
-            "courses_ef": _course_map_normalized_for_grade("EF"),
-            "courses_q1": _course_map_normalized_for_grade("Q1"),
-            "rooms": _parse_mapping(ROOM_MAP_PATH),
-        },
-        "seen": {
-            "subjects_raw": sorted(set(SEEN_SUBJECTS_RAW)),
-            "rooms_raw": sorted(set(SEEN_ROOMS_RAW)),
+            "users": list(_iter_backup_rows("users")),
+            "vacations": list(_iter_backup_rows("vacations")),
+            "exams_manual": list(_iter_backup_rows("exams_manual")),
+            "settings": _backup_settings(),
         },
+        "mappings": _backup_mappings(),
+        "seen": _backup_seen(),
     }
-    return payload
 
+def _iter_backup_records():
+    """The live backup as NDJSON records, read from the DB while iterating."""
+    yield {"section": "meta", "data": {**_backup_meta(), "format": "ndjson"}}
+    for table in _BACKUP_TABLES:
+        for row in _iter_backup_rows(table):
+            yield {"section": table, "row": row}
+    yield {"section": "settings", "data": _backup_settings()}
+    yield {"section": "mappings", "data": _backup_mappings()}
+    yield {"section": "seen", "data": _backup_seen()}
+
+def _backup_records_from_payload(payload: dict):
+    """NDJSON records for an in-memory backup payload."""
+    db_section = payload.get("database") or {}
+    yield {"section": "meta", "data": {**(payload.get("meta") or {}), "format": "ndjson"}}
+    for table in _BACKUP_TABLES:
+        for row in db_section.get(table) or []:
+            yield {"section": table, "row": row}
+    yield {"section": "settings", "data": db_section.get("settings") or {}}
+    yield {"section": "mappings", "data": payload.get("mappings") or {}}
+    yield {"section": "seen", "data": payload.get("seen") or {}}
+
+def _ndjson_lines(records):
+    for record in records:
+        yield (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def _gzip_chunks(chunks):
+    """Gzip a byte stream on the fly."""
+    comp = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        if out:
+            yield out
+    yield comp.flush()
+
+
+def _norm_backup_user(entry) -> tuple | None:
+    if not isinstance(entry, dict):
+        return None
+    username = (entry.get("username") or "").strip()
+    if not username:
+        return None
+    try:
+        user_id = int(entry.get("id"))
+    except (TypeError, ValueError):
+        user_id = None
+    profile = entry.get("profile") if isinstance(entry.get("profile"), dict) else None
+    if profile is None:
+        profile_raw = entry.get("profile_json")
+        if isinstance(profile_raw, str) and profile_raw.strip():
+            try:
+                profile = json.loads(profile_raw)
+            except Exception:
+                profile = None
+    # None when the entry carries no profile: the users insert stores an empty one, but
+    # backup_profiles gets no row, so _backup_profile_for keeps answering None for it
+    profile_json = json.dumps(_normalise_profile(profile)) if isinstance(profile, dict) else None
+    created_at = entry.get("created_at") or datetime.utcnow().isoformat()
+    return (user_id, username, entry.get("password_hash") or "", entry.get("password_plain"), profile_json, created_at)
+
+def _norm_backup_vacation(entry) -> tuple | None:
+    if not isinstance(entry, dict):
+        return None
+    title = (entry.get("title") or "").strip()
+    start_date = (entry.get("start_date") or "").strip()
+    end_date = (entry.get("end_date") or start_date).strip()
+    if not title or not start_date:
+        return None
+    try:
+        vac_id = int(entry.get("id"))
+    except (TypeError, ValueError):
+        vac_id = None
+    created_at = entry.get("created_at") or datetime.utcnow().isoformat()
+    return (vac_id, title, start_date, end_date, created_at)
+
+def _norm_backup_exam(entry) -> tuple | None:
+    if not isinstance(entry, dict):
+        return None
+    subj = (entry.get("subject") or "").strip()
+    date_iso = (entry.get("date") or "").strip()
+    start_hm = _normalise_hm(entry.get("start_time") or entry.get("start"))
+    end_hm = _normalise_hm(entry.get("end_time") or entry.get("end"))
+    if not subj or not date_iso or not start_hm or not end_hm:
+        return None
+    name = (entry.get("name") or "").strip() or subj
+    try:
+        exam_id = int(entry.get("id"))
+    except (TypeError, ValueError):
+        exam_id = None
+    classes = _clean_list_str(entry.get("classes") if isinstance(entry.get("classes"), list) else [])
+    teachers = _clean_list_str(entry.get("teachers") if isinstance(entry.get("teachers"), list) else [])
+    room = (entry.get("room") or "").strip()
+    note = (entry.get("note") or "").strip()
+    created_at = entry.get("created_at") or datetime.utcnow().isoformat()
+    grade = (entry.get("grade") or "").strip().upper()
+    return (exam_id, subj, name, date_iso, start_hm, end_hm, json.dumps(classes), json.dumps(teachers), room, note, grade, created_at)
+
+def _norm_backup_settings(settings_in) -> dict:
+    settings_payload = SETTINGS_DEFAULTS.copy()
+    if isinstance(settings_in, dict):
+        for key, value in settings_in.items():
+            if key in SETTINGS_DEFAULTS:
+                settings_payload[key] = str(value)
+    return settings_payload
+
+_BACKUP_INSERTS = {
+    "users": ("INSERT INTO users (id, username, password_hash, password_plain, profile_json, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+              _norm_backup_user),
+    "vacations": ("INSERT INTO vacations (id, title, start_date, end_date, created_at) VALUES (?, ?, ?, ?, ?)",
+                  _norm_backup_vacation),
+    "exams_manual": ("INSERT INTO exams_manual (id, subject, name, date, start_time, end_time, classes_json, teachers_json, room, note, grade, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                     _norm_backup_exam),
+}
+
+def _begin_backup_restore(db) -> None:
+    db.execute("BEGIN")
+    db.execute("DELETE FROM users")
+    db.execute("DELETE FROM vacations")
+    db.execute("DELETE FROM settings")
+    db.execute("DELETE FROM exams_manual")
+    db.execute("DELETE FROM backup_profiles")
+
+def _insert_backup_rows(db, table: str, rows: list[tuple]) -> None:
+    if table == "users":
+        db.executemany("INSERT OR REPLACE INTO backup_profiles (username, profile_json) VALUES (?, ?)",
+                       [(r[1], r[4]) for r in rows if r[4] is not None])
+        empty = json.dumps(_normalise_profile(_empty_profile()))
+        rows = [r if r[4] is not None else (*r[:4], empty, r[5]) for r in rows]
+    db.executemany(_BACKUP_INSERTS[table][0], rows)
+
+def _insert_backup_settings(db, settings_payload: dict) -> None:
+    db.executemany("INSERT INTO settings (key, value) VALUES (?, ?)", [(k, str(v)) for k, v in settings_payload.items()])
 
 def _apply_backup_payload(payload: dict) -> None:
     """Restore data from a backup payload (admin only)."""
     if not isinstance(payload, dict):
         raise ValueError("backup_payload_invalid")
+    payload = _resolve_backup_chain(payload)
 
     db_section = payload.get("database")
     mappings_section = payload.get("mappings")
@@ -1503,154 +2503,101 @@ def _apply_backup_payload(payload: dict) -> None:
         raise ValueError("backup_payload_invalid")
 
     # ---- Pre-validate and normalise before touching the DB ----
-    users_norm = []
-    users = db_section.get("users") or []
-    if isinstance(users, list):
-        for entry in users:
-            if not isinstance(entry, dict):
-                continue
-            username = (entry.get("username") or "").strip()
-            if not username:
-                continue
-            try:
-                user_id = int(entry.get("id"))
-            except (TypeError, ValueError):
-                user_id = None
-            profile = entry.get("profile") if isinstance(entry.get("profile"), dict) else None
-            if profile is None:
-                profile_raw = entry.get("profile_json")
-                if isinstance(profile_raw, str) and profile_raw.strip():
-                    try:
-                        profile = json.loads(profile_raw)
-                    except Exception:
-                        profile = None
-            if profile is None:
-                profile = _empty_profile()
-            profile_json = json.dumps(_normalise_profile(profile))
-            created_at = entry.get("created_at") or datetime.utcnow().isoformat()
-            users_norm.append((user_id, username, entry.get("password_hash") or "", entry.get("password_plain"), profile_json, created_at))
-
-    vacations_norm = []
-    vacations = db_section.get("vacations") or []
-    if isinstance(vacations, list):
-        for entry in vacations:
-            if not isinstance(entry, dict):
-                continue
-            title = (entry.get("title") or "").strip()
-            start_date = (entry.get("start_date") or "").strip()
-            end_date = (entry.get("end_date") or start_date).strip()
-            if not title or not start_date:
-                continue
-            try:
-                vac_id = int(entry.get("id"))
-            except (TypeError, ValueError):
-                vac_id = None
-            created_at = entry.get("created_at") or datetime.utcnow().isoformat()
-            vacations_norm.append((vac_id, title, start_date, end_date, created_at))
-
-    settings_in = db_section.get("settings") if isinstance(db_section, dict) else {}
-    settings_payload = SETTINGS_DEFAULTS.copy()
-    if isinstance(settings_in, dict):
-        for key, value in settings_in.items():
-            if key in SETTINGS_DEFAULTS:
-                settings_payload[key] = str(value)
-
-    exams_manual_norm = []
-    exams_manual_in = db_section.get("exams_manual") if isinstance(db_section, dict) else []
-    if isinstance(exams_manual_in, list):
-        for entry in exams_manual_in:
-            if not isinstance(entry, dict):
-                continue
-            subj = (entry.get("subject") or "").strip()
-            date_iso = (entry.get("date") or "").strip()
-            start_hm = _normalise_hm(entry.get("start_time") or entry.get("start"))
-            end_hm = _normalise_hm(entry.get("end_time") or entry.get("end"))
-            if not subj or not date_iso or not start_hm or not end_hm:
-                continue
-            name = (entry.get("name") or "").strip() or subj
-            try:
-                exam_id = int(entry.get("id"))
-            except (TypeError, ValueError):
-                exam_id = None
-            classes = _clean_list_str(entry.get("classes") if isinstance(entry.get("classes"), list) else [])
-            teachers = _clean_list_str(entry.get("teachers") if isinstance(entry.get("teachers"), list) else [])
-            room = (entry.get("room") or "").strip()
-            note = (entry.get("note") or "").strip()
-            created_at = entry.get("created_at") or datetime.utcnow().isoformat()
-            grade = (entry.get("grade") or "").strip().upper()
-            exams_manual_norm.append((exam_id, subj, name, date_iso, start_hm, end_hm, json.dumps(classes), json.dumps(teachers), room, note, grade, created_at))
-
-    courses_map = {}
-    courses = mappings_section.get("courses")
-    if isinstance(courses, dict):
-        for k, v in courses.items():
-            nk = norm_key(k)
-            courses_map[nk] = (v or "").strip()
-    # grade-specific maps, if present (preferred)
-    courses_map_ef = {}
-    courses_map_q1 = {}
-    courses_ef_in = mappings_section.get("courses_ef")
-    courses_q1_in = mappings_section.get("courses_q1")
-    if isinstance(courses_ef_in, dict):
-        for k, v in courses_ef_in.items():
-            nk = norm_key(k)
-            courses_map_ef[nk] = (v or "").strip()
-    if isinstance(courses_q1_in, dict):
-        for k, v in courses_q1_in.items():
-            nk = norm_key(k)
-            courses_map_q1[nk] = (v or "").strip()
-
-    rooms_map = {}
-    rooms = mappings_section.get("rooms")
-    if isinstance(rooms, dict):
-        for k, v in rooms.items():
-            nk = norm_key(k)
-            rooms_map[nk] = (v or "").strip()
-
-    subs_raw = seen_section.get("subjects_raw") if isinstance(seen_section, dict) else []
-    rooms_raw = seen_section.get("rooms_raw") if isinstance(seen_section, dict) else []
-    subs_norm = sorted({str(s or "").strip() for s in subs_raw if str(s or "").strip()}) if isinstance(subs_raw, list) else []
-    rooms_norm = sorted({str(r or "").strip() for r in rooms_raw if str(r or "").strip()}) if isinstance(rooms_raw, list) else []
+    rows: dict[str, list[tuple]] = {}
+    for table, (_, normalise) in _BACKUP_INSERTS.items():
+        entries = db_section.get(table) or []
+        rows[table] = [r for r in map(normalise, entries) if r] if isinstance(entries, list) else []
+    settings_payload = _norm_backup_settings(db_section.get("settings"))
 
     db = get_db()
     try:
-        db.execute("BEGIN")
-        db.execute("DELETE FROM users")
-        db.execute("DELETE FROM vacations")
-        db.execute("DELETE FROM settings")
-        db.execute("DELETE FROM exams_manual")
-
-        for row in users_norm:
-            db.execute(
-                "INSERT INTO users (id, username, password_hash, password_plain, profile_json, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-                row
-            )
-
-        for row in vacations_norm:
-            db.execute(
-                "INSERT INTO vacations (id, title, start_date, end_date, created_at) VALUES (?, ?, ?, ?, ?)",
-                row
-            )
-
-        for row in exams_manual_norm:
-            db.execute(
-                "INSERT INTO exams_manual (id, subject, name, date, start_time, end_time, classes_json, teachers_json, room, note, grade, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                row
-            )
-
-        for key, value in settings_payload.items():
-            db.execute(
-                "INSERT INTO settings (key, value) VALUES (?, ?)",
-                (key, str(value))
-            )
-
+        _begin_backup_restore(db)
+        for table in _BACKUP_INSERTS:
+            _insert_backup_rows(db, table, rows[table])
+        _insert_backup_settings(db, settings_payload)
         db.commit()
     except Exception:
         db.rollback()
         raise
+    _invalidate_settings()
+    _invalidate_vacations()
 
     # persist last backup for fallback logic
     _save_last_backup(payload)
+    _apply_backup_files(mappings_section, seen_section)
+
+def _restore_backup_ndjson(lines) -> None:
+    """
+    Restore an NDJSON backup while reading it: rows go to the DB via executemany in batches of
+    BACKUP_BATCH_ROWS inside one transaction, and are copied to the last-backup file as they pass.
+    """
+    db = get_db()
+    pending: dict[str, list[tuple]] = {table: [] for table in _BACKUP_INSERTS}
+    sections: dict = {}
+    started = False
+    tmp = f"{LAST_BACKUP_GZ_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with gzip.open(tmp, "wb") as copy:
+            for raw in lines:
+                if isinstance(raw, str):
+                    raw = raw.encode("utf-8")
+                if not raw.strip():
+                    continue
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    raise ValueError("backup_payload_invalid")
+                section = record.get("section") if isinstance(record, dict) else None
+                if not started:
+                    if section != "meta":
+                        raise ValueError("backup_payload_invalid")
+                    _begin_backup_restore(db)
+                    started = True
+                elif section in pending:
+                    row = _BACKUP_INSERTS[section][1](record.get("row"))
+                    if row:
+                        pending[section].append(row)
+                    if len(pending[section]) >= BACKUP_BATCH_ROWS:
+                        _insert_backup_rows(db, section, pending[section])
+                        pending[section].clear()
+                elif section in ("settings", "mappings", "seen"):
+                    sections[section] = record.get("data")
+                copy.write(raw if raw.endswith(b"\n") else raw + b"\n")
+            if not started or not isinstance(sections.get("mappings"), dict) or not isinstance(sections.get("seen"), dict):
+                raise ValueError("backup_payload_invalid")
+            for table, batch in pending.items():
+                _insert_backup_rows(db, table, batch)
+            _insert_backup_settings(db, _norm_backup_settings(sections.get("settings")))
+            db.commit()
+        os.replace(tmp, LAST_BACKUP_GZ_PATH)
+    except Exception:
+        if db.in_transaction:
+            db.rollback()
+        raise
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _invalidate_settings()
+    _invalidate_vacations()
+    _apply_backup_files(sections["mappings"], sections["seen"])
+
+def _apply_backup_files(mappings_section: dict, seen_section: dict) -> None:
+    """Write the mapping files and replace the seen registry from a backup."""
+    def _norm_map(value) -> dict[str, str]:
+        if not isinstance(value, dict):
+            return {}
+        return {norm_key(k): (v or "").strip() for k, v in value.items()}
+
+    courses_map = _norm_map(mappings_section.get("courses"))
+    # grade-specific maps, if present (preferred)
+    courses_map_ef = _norm_map(mappings_section.get("courses_ef"))
+    courses_map_q1 = _norm_map(mappings_section.get("courses_q1"))
+    rooms_map = _norm_map(mappings_section.get("rooms"))
+
+    subs_raw = seen_section.get("subjects_raw") if isinstance(seen_section, dict) else []
+    rooms_raw = seen_section.get("rooms_raw") if isinstance(seen_section, dict) else []
+    subs_norm = sorted({str(s or "").strip() for s in subs_raw if str(s or "").strip()}) if isinstance(subs_raw, list) else []
+    rooms_norm = sorted({str(r or "").strip() for r in rooms_raw if str(r or "").strip()}) if isinstance(rooms_raw, list) else []
 
     # write courses: prefer grade-specific maps when provided, otherwise legacy merged
     if courses_map_ef or courses_map_q1:
@@ -1665,40 +2612,367 @@ def _apply_backup_payload(payload: dict) -> None:
         _course_map_write_all(courses_map)
     _write_mapping_txt(ROOM_MAP_PATH, rooms_map)
 
-    global SEEN_SUBJECTS_RAW, SEEN_ROOMS_RAW, _last_seen_flush
-    SEEN_SUBJECTS_RAW = subs_norm
-    SEEN_ROOMS_RAW = rooms_norm
-    _save_seen_raw(SEEN_SUB_RAW_PATH, SEEN_SUBJECTS_RAW)
-    _save_seen_raw(SEEN_ROOM_RAW_PATH, SEEN_ROOMS_RAW)
-    _last_seen_flush = time.time()
-
+    # replace the seen registry wholesale; journaled variants from before the restore are dropped
+    with file_lock(SEEN_LOCK_PATH):
+        with _seen_lock:
+            _seen_pending.clear()
+            SEEN_SUBJECTS_RAW.clear(); SEEN_SUBJECTS_RAW.update(subs_norm)
+            SEEN_ROOMS_RAW.clear();    SEEN_ROOMS_RAW.update(rooms_norm)
+        _save_seen_raw(SEEN_SUB_RAW_PATH, subs_norm)
+        _save_seen_raw(SEEN_ROOM_RAW_PATH, rooms_norm)
+        open(SEEN_JOURNAL_PATH, "w").close()
+
+
+# Backup uploads run on one background thread; bursts of triggers within BACKUP_DEBOUNCE_SEC
+# collapse into a single upload of the state at send time.
+_backup_cv = threading.Condition()
+_backup_triggers: list[str] = []  # queued, not yet uploaded
+_backup_payload: dict | None = None  # prebuilt payload from the latest trigger, if any
+_backup_first_at = 0.0
+_backup_due_at = 0.0
+_backup_thread: threading.Thread | None = None
+_backup_stats = {"sent": 0, "full": 0, "deltas": 0, "unchanged": 0, "failed": 0, "coalesced": 0, "last_success": None, "last_error": None, "last_trigger": None}
 
 def _maybe_send_backup(trigger: str = "manual", payload: dict | None = None) -> None:
     """
-    Push a fresh backup to a webhook if configured (Render free tier loses disk).
-    The call is best-effort and time-limited so API responses are not blocked.
+    Queue a backup push to the webhook if configured (Render free tier loses disk).
+    Returns immediately; the upload happens on the backup thread after a short debounce.
     """
+    global _backup_payload, _backup_first_at, _backup_due_at, _backup_thread
     if not BACKUP_WEBHOOK_URL:
         return
+    now = time.time()
+    with _backup_cv:
+        if not _backup_triggers:
+            _backup_first_at = now
+        _backup_triggers.append(trigger)
+        _backup_payload = payload  # a later trigger without payload means the prebuilt one is stale
+        _backup_due_at = min(now + max(0.0, BACKUP_DEBOUNCE_SEC), _backup_first_at + max(0.0, BACKUP_MAX_DELAY_SEC))
+        if _backup_thread is None:
+            _backup_thread = threading.Thread(target=_backup_worker, name="backup-upload", daemon=True)
+            _backup_thread.start()
+            atexit.register(_flush_backup_queue)
+        _backup_cv.notify()
+
+def _take_backup_batch() -> tuple[list[str], dict | None]:
+    """Caller holds _backup_cv."""
+    global _backup_payload
+    triggers = _backup_triggers[:]
+    payload = _backup_payload
+    _backup_triggers.clear()
+    _backup_payload = None
+    return triggers, payload
+
+def _upload_backup(triggers: list[str], payload: dict | None) -> None:
+    """POST one backup covering all triggers; best-effort, outcome goes to _backup_stats."""
+    label = ",".join(dict.fromkeys(triggers))
     try:
-        data = payload or _build_backup_payload()
-        headers = {"User-Agent": "untis-pwa/backup"}
-        requests.post(BACKUP_WEBHOOK_URL, json=data, timeout=8, headers=headers)
+        if payload is None:
+            with app.app_context():
+                payload = _build_backup_payload()
+        # the state file holds what the webhook last acknowledged, shared by all workers;
+        # the lock covers reading and recording it, never the HTTP call
+        with file_lock(BACKUP_STATE_PATH + ".lock"):
+            state = read_json(BACKUP_STATE_PATH, {}) or {}
+        body, new_state = _backup_body(payload, state)
+        if body is not None:
+            headers = {"User-Agent": "untis-pwa/backup"}
+            if BACKUP_WEBHOOK_GZIP:
+                # base64 keeps the gzip body intact through Apps Script's text-only postData
+                raw = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                headers["Content-Type"] = "application/x-gzip-base64"
+                resp = requests.post(BACKUP_WEBHOOK_URL, data=base64.b64encode(gzip.compress(raw)), timeout=8, headers=headers)
+            else:
+                resp = requests.post(BACKUP_WEBHOOK_URL, json=body, timeout=8, headers=headers)
+            resp.raise_for_status()
+            with file_lock(BACKUP_STATE_PATH + ".lock"):
+                if (read_json(BACKUP_STATE_PATH, {}) or {}) != state:
+                    # another worker uploaded against the same base meanwhile; the delta chain
+                    # is ambiguous now, so an empty state makes the next upload a full snapshot
+                    new_state = {}
+                atomic_write_json(BACKUP_STATE_PATH, new_state)
     except Exception as exc:
-        app.logger.warning("backup webhook failed (%s): %s", trigger, exc)
+        app.logger.warning("backup webhook failed (%s): %s", label, exc)
+        with _backup_cv:
+            _backup_stats["failed"] += 1
+            _backup_stats["last_error"] = f"{datetime.now(APP_TZ).isoformat()} {exc}"
+        return
+    if body is None:
+        with _backup_cv:
+            _backup_stats["unchanged"] += 1
+        return
+    with _backup_cv:
+        _backup_stats["deltas" if body["meta"].get("kind") == "delta" else "full"] += 1
+        _backup_stats["sent"] += 1
+        _backup_stats["coalesced"] += len(triggers) - 1
+        _backup_stats["last_success"] = datetime.now(APP_TZ).isoformat()
+        _backup_stats["last_trigger"] = label
+
+# ---- Backup content hashing and incremental deltas ----
+# A full snapshot is the regular backup payload plus meta.kind/snapshot_id/hash. With
+# BACKUP_INCREMENTAL, later uploads are deltas against the last acknowledged state:
+#   {"meta": {"kind": "delta", "base_id", "seq", "prev_hash", "hash", ...},
+#    "tables": {table: {"upsert": [rows], "delete": [ids]}}, "sections": {name: value}}
+# Restores accept a full payload or a chain {"base": full, "deltas": [...]}.
+BACKUP_STATE_PATH = os.path.join(DATA_DIR, "backup_state.json")
+_BACKUP_TABLES = ("users", "vacations", "exams_manual")
+_BACKUP_SECTIONS = ("settings", "mappings", "seen")
+
+def _backup_section(payload: dict, name: str):
+    if name == "settings":
+        return (payload.get("database") or {}).get("settings")
+    return payload.get(name)
+
+def _set_backup_section(payload: dict, name: str, value) -> None:
+    if name == "settings":
+        payload["database"]["settings"] = value
+    else:
+        payload[name] = value
 
+def _backup_fingerprint(payload: dict) -> dict:
+    """Content hash of the whole backup (meta excluded) plus per-section and per-row hashes."""
+    db_section = payload.get("database") or {}
+    return {
+        "hash": _payload_etag({k: v for k, v in payload.items() if k != "meta"}),
+        "sections": {name: _payload_etag(_backup_section(payload, name)) for name in _BACKUP_SECTIONS},
+        "rows": {
+            table: {str(row.get("id")): _payload_etag(row) for row in db_section.get(table) or [] if isinstance(row, dict)}
+            for table in _BACKUP_TABLES
+        },
+    }
 
-def _maybe_auto_restore() -> None:
-    """If AUTO_RESTORE_URL is set and DB is empty, pull a backup JSON and restore it."""
-    if not AUTO_RESTORE_URL:
+def _backup_body(payload: dict, state: dict) -> tuple[dict | None, dict]:
+    """Return (body to upload or None when unchanged, state to store once acknowledged)."""
+    fp = _backup_fingerprint(payload)
+    if fp["hash"] == state.get("hash"):
+        return None, state
+    meta = {**(payload.get("meta") or {}), "exported_at": datetime.now(APP_TZ).isoformat(), "hash": fp["hash"]}
+    if not BACKUP_INCREMENTAL:
+        return {**payload, "meta": {**meta, "kind": "full"}}, {"hash": fp["hash"]}
+    seq = int(state.get("seq") or 0) + 1
+    if state.get("snapshot_id") and "rows" in state and seq <= BACKUP_FULL_EVERY:
+        db_section = payload.get("database") or {}
+        tables = {}
+        for table in _BACKUP_TABLES:
+            old_rows, new_rows = state["rows"].get(table) or {}, fp["rows"][table]
+            upsert = [row for row in db_section.get(table) or []
+                      if isinstance(row, dict) and old_rows.get(str(row.get("id"))) != new_rows.get(str(row.get("id")))]
+            delete = [row_id for row_id in old_rows if row_id not in new_rows]
+            if upsert or delete:
+                tables[table] = {"upsert": upsert, "delete": delete}
+        sections = {name: _backup_section(payload, name) for name in _BACKUP_SECTIONS
+                    if (state.get("sections") or {}).get(name) != fp["sections"][name]}
+        body = {
+            "meta": {**meta, "kind": "delta", "base_id": state["snapshot_id"], "seq": seq, "prev_hash": state.get("hash")},
+            "tables": tables,
+            "sections": sections,
+        }
+        return body, {**fp, "snapshot_id": state["snapshot_id"], "seq": seq}
+    snapshot_id = f"{int(time.time())}-{os.urandom(4).hex()}"
+    return {**payload, "meta": {**meta, "kind": "full", "snapshot_id": snapshot_id}}, {**fp, "snapshot_id": snapshot_id, "seq": 0}
+
+def _apply_backup_delta(payload: dict, delta: dict) -> None:
+    """Apply one delta to a full payload in place."""
+    db_section = payload.setdefault("database", {})
+    for table, change in (delta.get("tables") or {}).items():
+        if table not in _BACKUP_TABLES or not isinstance(change, dict):
+            continue
+        rows = {str(row.get("id")): row for row in db_section.get(table) or [] if isinstance(row, dict)}
+        for row_id in change.get("delete") or []:
+            rows.pop(str(row_id), None)
+        for row in change.get("upsert") or []:
+            if isinstance(row, dict):
+                rows[str(row.get("id"))] = row
+        db_section[table] = list(rows.values())
+    for name, value in (delta.get("sections") or {}).items():
+        if name in _BACKUP_SECTIONS:
+            _set_backup_section(payload, name, value)
+
+def _backup_exported_at(body: dict) -> float:
+    """meta.exported_at as a timestamp (0 when missing or malformed)."""
+    try:
+        return datetime.fromisoformat(str((body.get("meta") or {}).get("exported_at"))).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+def _resolve_backup_chain(payload: dict) -> dict:
+    """Fold {"base": full, "deltas": [...]} into one full payload; plain full payloads pass through."""
+    if "base" not in payload:
+        if (payload.get("meta") or {}).get("kind") == "delta":
+            raise ValueError("backup_delta_without_base")
+        return payload
+    base = payload.get("base")
+    if not isinstance(base, dict):
+        raise ValueError("backup_payload_invalid")
+    base_meta = base.get("meta") or {}
+    resolved = {**base, "database": dict(base.get("database") or {})}
+    deltas = [d for d in payload.get("deltas") or []
+              if isinstance(d, dict) and (d.get("meta") or {}).get("base_id") == base_meta.get("snapshot_id")]
+    # a retried upload (webhook stored it, but the POST timed out) repeats the seq as a newer
+    # superset computed against the same base state: per seq, the latest export wins
+    by_seq: dict[int, dict] = {}
+    for delta in deltas:
+        delta_seq = int(delta["meta"].get("seq") or 0)
+        kept = by_seq.get(delta_seq)
+        if kept is None or _backup_exported_at(delta) >= _backup_exported_at(kept):
+            by_seq[delta_seq] = delta
+    seq, last_hash = 0, base_meta.get("hash")
+    for delta_seq, delta in sorted(by_seq.items()):
+        if delta_seq <= seq:
+            continue
+        if delta_seq != seq + 1:
+            app.logger.warning("backup chain has a gap after seq %s; later deltas ignored", seq)
+            break
+        _apply_backup_delta(resolved, delta)
+        seq, last_hash = delta_seq, delta["meta"].get("hash")
+    resolved["meta"] = {**base_meta, "seq": seq, "hash": last_hash}
+    return resolved
+
+def _backup_worker() -> None:
+    while True:
+        with _backup_cv:
+            while not _backup_triggers:
+                _backup_cv.wait()
+            # debounce: each new trigger pushes the deadline out (bounded by BACKUP_MAX_DELAY_SEC)
+            while (delay := _backup_due_at - time.time()) > 0:
+                _backup_cv.wait(delay)
+            triggers, payload = _take_backup_batch()
+        _upload_backup(triggers, payload)
+
+def _flush_backup_queue() -> None:
+    """Upload still-queued triggers synchronously (process exit)."""
+    with _backup_cv:
+        triggers, payload = _take_backup_batch()
+    if triggers:
+        _upload_backup(triggers, payload)
+
+def _backup_queue_stats() -> dict:
+    with _backup_cv:
+        return {**_backup_stats, "queued": len(_backup_triggers), "enabled": bool(BACKUP_WEBHOOK_URL)}
+
+
+# ---- Local DB snapshots (sqlite3 online backup API) ----
+_SNAPSHOT_PREFIX = "user_data-"
+
+def _list_snapshots() -> list[str]:
+    """Snapshot paths, newest first (names carry a sortable UTC timestamp)."""
+    try:
+        names = [n for n in os.listdir(SNAPSHOT_DIR) if n.startswith(_SNAPSHOT_PREFIX) and n.endswith(".db")]
+    except FileNotFoundError:
+        return []
+    return [os.path.join(SNAPSHOT_DIR, n) for n in sorted(names, reverse=True)]
+
+def _prune_snapshots() -> None:
+    """Keep the SNAPSHOT_KEEP newest plus the newest snapshot of each of the last SNAPSHOT_KEEP_DAYS days."""
+    snapshots = _list_snapshots()
+    keep = set(snapshots[:max(1, SNAPSHOT_KEEP)])
+    days: set[str] = set()
+    for path in snapshots:
+        day = os.path.basename(path)[len(_SNAPSHOT_PREFIX):][:8]
+        if day not in days and len(days) < SNAPSHOT_KEEP_DAYS:
+            days.add(day)
+            keep.add(path)
+    for path in snapshots:
+        if path not in keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _write_db_snapshot(min_age_sec: float = 0) -> str | None:
+    """Write a consistent copy of the DB via Connection.backup; None when skipped."""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with file_lock(os.path.join(SNAPSHOT_DIR, ".lock")):
+        snapshots = _list_snapshots()
+        if snapshots and min_age_sec and time.time() - os.path.getmtime(snapshots[0]) < min_age_sec:
+            return None  # another worker just wrote one
+        src = _connect_db()
+        try:
+            if src.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+                return None  # never rotate good snapshots out for an empty DB
+            path = os.path.join(SNAPSHOT_DIR, f"{_SNAPSHOT_PREFIX}{datetime.utcnow():%Y%m%dT%H%M%S}.db")
+            tmp = path + ".tmp"
+            dst = sqlite3.connect(tmp)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+            os.replace(tmp, path)
+        finally:
+            src.close()
+        _prune_snapshots()
+    return path
+
+def _snapshot_is_valid(path: str) -> bool:
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                return False
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] > 0
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+
+def _restore_latest_snapshot() -> str | None:
+    """Copy the newest valid snapshot into the live DB; returns its path or None."""
+    for path in _list_snapshots():
+        if not _snapshot_is_valid(path):
+            app.logger.warning("skipping invalid DB snapshot %s", path)
+            continue
+        src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            src.backup(get_db())
+        finally:
+            src.close()
+        _invalidate_settings()
+        _invalidate_vacations()
+        return path
+    return None
+
+_snapshot_started = False
+
+def _start_snapshot_worker():
+    """Fire a daemon thread that snapshots the DB every SNAPSHOT_INTERVAL_MIN minutes."""
+    global _snapshot_started
+    if _snapshot_started or SNAPSHOT_INTERVAL_MIN <= 0:
         return
+    _snapshot_started = True
+    interval = SNAPSHOT_INTERVAL_MIN * 60
+
+    def _worker():
+        while True:
+            time.sleep(interval)
+            try:
+                _write_db_snapshot(min_age_sec=interval / 2)
+            except Exception as exc:
+                app.logger.warning("DB snapshot failed: %s", exc)
+
+    t = threading.Thread(target=_worker, name="db-snapshot", daemon=True)
+    t.start()
+
+def _maybe_auto_restore() -> None:
+    """
+    If the DB is empty, restore the newest valid local snapshot; otherwise (or with
+    AUTO_RESTORE_FORCE) pull a backup JSON from AUTO_RESTORE_URL and restore it.
+    """
     try:
         cur = get_db().execute("SELECT COUNT(*) FROM users")
-        if cur.fetchone()[0] > 0 and not AUTO_RESTORE_FORCE:
-            return
+        empty = cur.fetchone()[0] == 0
     except Exception as exc:
         app.logger.warning("auto-restore precheck failed: %s", exc)
         return
+    if empty:
+        try:
+            path = _restore_latest_snapshot()
+            if path:
+                app.logger.info("auto-restore from local snapshot %s succeeded", path)
+                return
+        except Exception as exc:
+            app.logger.warning("snapshot restore failed: %s", exc)
+    if not AUTO_RESTORE_URL or (not empty and not AUTO_RESTORE_FORCE):
+        return
     try:
         resp = requests.get(AUTO_RESTORE_URL, timeout=20)
         resp.raise_for_status()
@@ -1740,6 +3014,52 @@ def _start_auto_backup_worker():
     t = threading.Thread(target=_worker, name="auto-backup", daemon=True)
     t.start()
 
+_refresh_started = False
+
+
+def _refresh_tick() -> None:
+    """Refresh the current/next week and the default exam window unless another worker just did; archive last week."""
+    min_age = _refresh_delay() / 2
+    ws = _default_week_start()
+    next_ws = ws + timedelta(days=7)
+    if not (_week_cached_fresh(_week_key(ws), min_age) and _week_cached_fresh(_week_key(next_ws), min_age)):
+        # one range fetch per grade; if a grade fails, refresh the current week with its fallbacks
+        if not _prefetch_weeks(ws, 2):
+            _refresh_week(ws)
+
+    today = datetime.now(APP_TZ).date()
+    start, end = today, today + timedelta(days=30)
+    grades = available_grades() or ["EF"]
+    if _cached_payload(_exam_cache, _exam_key(start, end, 0, grades), min_age, record=False) is None:
+        _refresh_exams(start, end, 0, grades)
+
+    # freeze last week once it is over, even if nobody looks at it
+    last_ws = _monday_of(today) - timedelta(days=7)
+    if not ARCHIVE.has_week(last_ws, grades):
+        _refresh_week(last_ws)
+
+
+def _start_refresh_worker():
+    """Fire a daemon thread that keeps the default timetable/exam views warm (stale-while-revalidate)."""
+    global _refresh_started
+    if _refresh_started or REFRESH_INTERVAL_SEC <= 0:
+        return
+    _refresh_started = True
+
+    def _worker():
+        while True:
+            delay = REFRESH_INTERVAL_SEC  # fallback when the tick or the policy lookup fails
+            try:
+                with app.app_context():
+                    _refresh_tick()
+                    delay = _refresh_delay()  # may read the vacation index from the DB
+            except Exception as exc:
+                app.logger.warning("background refresh failed: %s", exc)
+            time.sleep(delay)
+
+    t = threading.Thread(target=_worker, name="untis-refresh", daemon=True)
+    t.start()
+
 # Attempt a one-time auto-restore on cold start if the DB is empty, then start periodic backups
 try:
     with app.app_context():
@@ -1749,17 +3069,39 @@ try:
 except Exception:
     app.logger.exception("auto-restore hook failed")
 
+# Local workers run whatever happened above; the backup worker stays behind the restore so an
+# empty DB is never pushed over the remote backup.
+for _start_worker in (_start_refresh_worker, _start_seen_worker, _start_snapshot_worker):
+    try:
+        with app.app_context():
+            _start_worker()
+    except Exception:
+        app.logger.exception("%s failed", _start_worker.__name__)
+
 
 @app.route("/api/admin/backup")
 def admin_backup():
     if not _require_admin():
         return jsonify({"ok": False, "error": "unauthorized"}), 401
-    payload = _build_backup_payload()
-    _maybe_send_backup("admin_backup", payload)
-    # fixed filename so browser download matches the single-file backup pattern
-    filename = "untis-backup.json"
-    resp = make_response(json.dumps(payload, ensure_ascii=False, indent=2))
-    resp.headers["Content-Type"] = "application/json"
+    compress = request.args.get("gzip") == "1"
+    if request.args.get("format") == "ndjson":
+        # streamed straight from the DB; never held in memory as a whole
+        _maybe_send_backup("admin_backup")
+        chunks = _ndjson_lines(_iter_backup_records())
+        filename = "untis-backup.ndjson"
+        resp = app.response_class(stream_with_context(_gzip_chunks(chunks) if compress else chunks),
+                                  mimetype="application/x-ndjson")
+    else:
+        payload = _build_backup_payload()
+        _maybe_send_backup("admin_backup", payload)
+        # fixed filename so browser download matches the single-file backup pattern
+        filename = "untis-backup.json"
+        body = json.dumps(payload, ensure_ascii=False, indent=2)
+        resp = make_response(gzip.compress(body.encode("utf-8")) if compress else body)
+        resp.headers["Content-Type"] = "application/json"
+    if compress:
+        filename += ".gz"
+        resp.headers["Content-Type"] = "application/gzip"
     resp.headers["Content-Disposition"] = f'attachment; filename=\"{filename}\"'
     return _no_store(resp)
 
@@ -1768,11 +3110,27 @@ def admin_backup():
 def admin_restore():
     if not _require_admin():
         return jsonify({"ok": False, "error": "unauthorized"}), 401
-    payload = request.get_json(silent=True)
-    if not payload:
-        return jsonify({"ok": False, "error": "invalid_backup"}), 400
+    compressed = (request.content_encoding or "").lower() == "gzip" or request.mimetype in ("application/gzip", "application/x-gzip")
+    ndjson = request.mimetype == "application/x-ndjson" or request.args.get("format") == "ndjson"
+    payload = None
+    if not ndjson:
+        if compressed:
+            try:
+                payload = json.loads(gzip.decompress(request.get_data()))
+            except (gzip.BadGzipFile, zlib.error, EOFError, ValueError):
+                payload = None
+        else:
+            payload = request.get_json(silent=True)
+        if not payload:
+            return jsonify({"ok": False, "error": "invalid_backup"}), 400
     try:
-        _apply_backup_payload(payload)
+        if ndjson:
+            _restore_backup_ndjson(gzip.GzipFile(fileobj=request.stream) if compressed else request.stream)
+        else:
+            _apply_backup_payload(payload)
+    except (gzip.BadGzipFile, zlib.error, EOFError) as exc:
+        app.logger.warning("restore stream unreadable: %s", exc)
+        return jsonify({"ok": False, "error": "invalid_backup"}), 400
     except ValueError as exc:
         return jsonify({"ok": False, "error": str(exc)}), 400
     except Exception:
@@ -1793,7 +3151,7 @@ def admin_state():
 
     groups_sub_ef = _group_variants(_load_raw_subjects_for_grade("EF"))
     groups_sub_q1 = _group_variants(_load_raw_subjects_for_grade("Q1"))
-    groups_rm  = _group_variants(SEEN_ROOMS_RAW)
+    groups_rm  = _group_variants(_seen_snapshot("rooms"))
 
     unmapped_sub_ef = [nk for nk in sorted(groups_sub_ef.keys()) if nk not in courses_ef]
     unmapped_sub_q1 = [nk for nk in sorted(groups_sub_q1.keys()) if nk not in courses_q1]
@@ -1968,6 +3326,7 @@ def admin_vacations():
         (title, start.isoformat(), end.isoformat())
     )
     db.commit()
+    _invalidate_vacations()
     _maybe_send_backup("admin_vacations_create")
     return _no_store(jsonify({"ok": True}))
 
@@ -1993,6 +3352,7 @@ def admin_delete_vacation(vac_id: int):
     db.commit()
     if cur.rowcount == 0:
         return _no_store(jsonify({"ok": False, "error": "not_found"})), 404
+    _invalidate_vacations()
     _maybe_send_backup("admin_vacation_delete")
     return _no_store(jsonify({"ok": True, "deleted": vac_id}))
 
@@ -2048,6 +3408,30 @@ def admin_delete_exam(exam_id: int):
     _maybe_send_backup("admin_exams_delete")
     return _no_store(jsonify({"ok": True, "deleted": exam_id}))
 
+
+@app.route("/api/admin/stats")
+def admin_stats():
+    if not _require_admin():
+        return jsonify({"ok": False, "error": "unauthorized"}), 401
+    return _no_store(jsonify({
+        "ok": True,
+        "cache": {"timetable": _week_cache.stats(), "exams": _exam_cache.stats()},
+        "freshness": {"period": _freshness_period(), "ttl": _freshness_sec(), "refreshDelay": _refresh_delay()},
+        "mappings": {"version": mapping_version(), "files": len(_mapping_cache)},
+        "archive": ARCHIVE.stats(),
+        "backup": _backup_queue_stats(),
+        "snapshots": [os.path.basename(p) for p in _list_snapshots()],
+    }))
+
+
+@app.route("/api/admin/untis/master/refresh", methods=["POST"])
+def admin_refresh_master():
+    """Drop cached Untis master data (teachers/subjects/rooms/classes) for all grades."""
+    if not _require_admin():
+        return jsonify({"ok": False, "error": "unauthorized"}), 401
+    invalidate_master_data()
+    return _no_store(jsonify({"ok": True}))
+
 if __name__ == "__main__":
     debug_enabled = str(os.environ.get("FLASK_DEBUG", "")).lower() in ("1", "true", "yes")
     host = os.environ.get("FLASK_HOST", "0.0.0.0")
@@ -0,0 +1,102 @@
+"""Immutable archive of ended timetable weeks (one row per week and grade)."""
+import json, os, sqlite3, threading, time, zlib
+from datetime import date
+
+
+class TimetableArchive:
+    """
+    SQLite store for weeks that can no longer change. Each (week, grade) row holds the
+    lessons as zlib-compressed compact JSON; the grade is implied by the row and
+    re-added on read. Rows are replaced only by an explicit put() (refreeze/backfill).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS archive_weeks (
+                week_start TEXT NOT NULL,
+                grade TEXT NOT NULL,
+                lessons BLOB NOT NULL,
+                frozen_at REAL NOT NULL,
+                PRIMARY KEY (week_start, grade)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _pack(lessons: list[dict]) -> bytes:
+        rows = [{k: v for k, v in L.items() if k != "grade"} for L in lessons]
+        raw = json.dumps(rows, ensure_ascii=False, separators=(",", ":"), default=str)
+        return zlib.compress(raw.encode("utf-8"), 9)
+
+    @staticmethod
+    def _unpack(blob: bytes, grade: str) -> list[dict]:
+        lessons = json.loads(zlib.decompress(blob).decode("utf-8"))
+        for L in lessons:
+            L["grade"] = grade
+        return lessons
+
+    def put(self, week_start: date, grade: str, lessons: list[dict]) -> None:
+        self.put_many(week_start, {grade: lessons})
+
+    def put_many(self, week_start: date, by_grade: dict[str, list[dict]]) -> None:
+        """Freeze several grades of one week in a single transaction."""
+        if not by_grade:
+            return
+        now = time.time()
+        rows = [(week_start.isoformat(), grade, self._pack(lessons), now) for grade, lessons in by_grade.items()]
+        conn = self._conn()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO archive_weeks VALUES (?, ?, ?, ?)", rows)
+
+    def get_week(self, week_start: date, grades: list[str] | None = None) -> dict[str, list[dict]] | None:
+        """
+        {grade: lessons} for an archived week, or None when any of grades (default:
+        whatever is stored) is missing, so partial weeks are never served.
+        """
+        try:
+            rows = self._conn().execute(
+                "SELECT grade, lessons FROM archive_weeks WHERE week_start = ?", (week_start.isoformat(),)
+            ).fetchall()
+        except sqlite3.Error:
+            return None
+        stored = {grade: blob for grade, blob in rows}
+        wanted = list(grades) if grades is not None else sorted(stored)
+        if not wanted or any(g not in stored for g in wanted):
+            return None
+        return {g: self._unpack(stored[g], g) for g in wanted}
+
+    def archived_grades(self, week_start: date) -> set[str]:
+        try:
+            rows = self._conn().execute(
+                "SELECT grade FROM archive_weeks WHERE week_start = ?", (week_start.isoformat(),)
+            ).fetchall()
+        except sqlite3.Error:
+            return set()
+        return {r[0] for r in rows}
+
+    def has_week(self, week_start: date, grades: list[str]) -> bool:
+        return set(grades) <= self.archived_grades(week_start)
+
+    def stats(self) -> dict:
+        try:
+            weeks, rows, size = self._conn().execute(
+                "SELECT COUNT(DISTINCT week_start), COUNT(*), COALESCE(SUM(LENGTH(lessons)), 0) FROM archive_weeks"
+            ).fetchone()
+        except sqlite3.Error:
+            weeks, rows, size = 0, 0, 0
+        return {"weeks": weeks, "rows": rows, "bytes": size}
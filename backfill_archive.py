@@ -0,0 +1,97 @@
+import argparse, os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+DATA_DIR.mkdir(exist_ok=True)
+
+load_dotenv(dotenv_path=BASE_DIR / ".env")
+
+from archive import TimetableArchive
+from untis_client import available_grades, run_per_grade
+
+ARCHIVE_PATH = os.environ.get("ARCHIVE_PATH", str(DATA_DIR / "archive.db"))
+
+
+def monday_of(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+def school_year_start(today: date) -> date:
+    """1 August of the running school year."""
+    year = today.year if today.month >= 8 else today.year - 1
+    return date(year, 8, 1)
+
+
+def _parse_date(value: str, name: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise SystemExit(f"{name} must be YYYY-MM-DD")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load ended timetable weeks into the archive.")
+    parser.add_argument("--grade", action="append", help="Grade to archive (e.g. EF or Q1). Default: all configured.")
+    parser.add_argument("--start", help="First day (YYYY-MM-DD). Default: 1 August of the current school year.")
+    parser.add_argument("--end", help="Last day (YYYY-MM-DD). Default: end of last week.")
+    parser.add_argument("--chunk-weeks", type=int, default=10, help="Weeks requested per range fetch.")
+    parser.add_argument("--refreeze", action="store_true", help="Overwrite weeks that are already archived.")
+    args = parser.parse_args()
+
+    today = datetime.today().date()
+    last_ended = monday_of(today) - timedelta(days=1)  # Sunday of last week
+    start = _parse_date(args.start, "start") if args.start else school_year_start(today)
+    end = _parse_date(args.end, "end") if args.end else last_ended
+    end = min(end, last_ended)  # running and future weeks are never frozen
+    first, last = monday_of(start), monday_of(end)
+    if last < first:
+        raise SystemExit("Nothing to archive: the range contains no ended week.")
+
+    configured = set(available_grades())
+    grades = [g.strip().upper() for g in args.grade] if args.grade else sorted(configured)
+    if not grades:
+        raise SystemExit("No grades configured. Check UNTIS env vars.")
+    unknown = [g for g in grades if g not in configured]
+    if unknown:
+        raise SystemExit(f"Unknown grade(s): {', '.join(unknown)}. Available: {', '.join(sorted(configured))}")
+
+    archive = TimetableArchive(ARCHIVE_PATH)
+    step = timedelta(days=7 * max(1, args.chunk_weeks))
+    frozen = skipped = failed = 0
+    chunk = first
+    while chunk <= last:
+        chunk_last = min(last, chunk + step - timedelta(days=7))
+        weeks = []
+        ws = chunk
+        while ws <= chunk_last:
+            weeks.append(ws)
+            ws += timedelta(days=7)
+        todo = {}  # week -> grades still to fetch
+        for ws in weeks:
+            done = set() if args.refreeze else archive.archived_grades(ws)
+            todo[ws] = [g for g in grades if g not in done]
+        wanted = sorted({g for gs in todo.values() for g in gs})
+        skipped += sum(len(grades) - len(gs) for gs in todo.values())
+        if wanted:
+            results = run_per_grade(lambda client: client.fetch_range(chunk, chunk_last + timedelta(days=6)), wanted)
+            for grade, res in results.items():
+                if isinstance(res, Exception):
+                    print(f"[WARN] {grade} {chunk}..{chunk_last}: fetch failed ({res})")
+                    failed += sum(1 for gs in todo.values() if grade in gs)
+            for ws in weeks:
+                by_grade = {g: results[g].get(ws, []) for g in todo[ws] if not isinstance(results.get(g), Exception)}
+                archive.put_many(ws, by_grade)
+                frozen += len(by_grade)
+        print(f"  {chunk}..{chunk_last}: {len(wanted)} grade(s) fetched")
+        chunk = chunk_last + timedelta(days=7)
+
+    stats = archive.stats()
+    print(f"Archive {ARCHIVE_PATH}: {frozen} week/grade rows frozen, {skipped} already archived, {failed} failed")
+    print(f"  {stats['weeks']} weeks, {stats['rows']} rows, {stats['bytes']} bytes")
+
+
+if __name__ == "__main__":
+    main()
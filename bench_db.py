@@ -0,0 +1,87 @@
+# bench_db.py
+"""Measure /api/profile and /api/vacations throughput against a throwaway SQLite DB.
+
+Runs the Flask app in-process via the test client; WebUntis is never contacted.
+"""
+import argparse, os, sys, tempfile, threading, time
+
+_TMP = tempfile.mkdtemp(prefix="untis-bench-")
+os.environ["DB_PATH"] = os.path.join(_TMP, "bench.db")
+os.environ["REFRESH_INTERVAL_SEC"] = "0"
+for _name, _value in (
+    ("UNTIS_BASE", "https://bench.invalid/WebUntis/jsonrpc.do"),
+    ("UNTIS_SCHOOL", "bench"),
+    ("UNTIS_USER", "bench"),
+    ("UNTIS_PASS", "bench"),
+    ("SECRET_KEY", "bench"),
+    ("ADMIN_TOKEN", "bench"),
+):
+    os.environ.setdefault(_name, _value)
+for _name in ("BACKUP_WEBHOOK_URL", "AUTO_RESTORE_URL"):
+    os.environ.pop(_name, None)
+
+from app import app, get_db
+
+
+def _seed(vacations: int) -> None:
+    with app.app_context():
+        db = get_db()
+        for i in range(vacations):
+            db.execute(
+                "INSERT INTO vacations (title, start_date, end_date) VALUES (?, ?, ?)",
+                (f"Ferien {i}", f"2026-{1 + i % 12:02d}-01", f"2026-{1 + i % 12:02d}-10"),
+            )
+        db.commit()
+
+
+def _client(username: str):
+    client = app.test_client()
+    client.post("/api/auth/register", json={"username": username, "password": "bench"}, base_url="https://localhost")
+    client.put(
+        "/api/profile",
+        json={"name": username, "courses": ["EF:gk mathe 1", "EF:lk englisch 1"]},
+        base_url="https://localhost",
+    )
+    return client
+
+
+def _run(path: str, requests_total: int, threads: int) -> float:
+    clients = [_client(f"bench-{path.strip('/').replace('/', '-')}-{threads}-{i}") for i in range(threads)]
+    per_thread = max(1, requests_total // threads)
+    failures = []
+
+    def _worker(client):
+        for _ in range(per_thread):
+            r = client.get(path, base_url="https://localhost")
+            if r.status_code != 200:
+                failures.append(r.status_code)
+
+    workers = [threading.Thread(target=_worker, args=(c,)) for c in clients]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    if failures:
+        sys.exit(f"{path}: {len(failures)} failed requests (first status {failures[0]})")
+    return (per_thread * threads) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DB-backed API throughput.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint and thread setting.")
+    parser.add_argument("--threads", type=int, nargs="*", default=[1, 4], help="Concurrent client threads.")
+    parser.add_argument("--vacations", type=int, default=40, help="Vacation rows to seed.")
+    args = parser.parse_args()
+
+    _seed(args.vacations)
+    print(f"db={os.environ['DB_PATH']}  requests={args.requests}")
+    print(f"{'endpoint':<16} {'threads':>7} {'req/s':>9}")
+    for path in ("/api/profile", "/api/vacations"):
+        for threads in args.threads:
+            print(f"{path:<16} {threads:>7} {_run(path, args.requests, threads):>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
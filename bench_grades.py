@@ -0,0 +1,69 @@
+# bench_grades.py
+"""Compare sequential vs concurrent multi-grade week fetching with simulated Untis latency.
+
+No network access: every simulated grade sleeps for --latency seconds per fetch.
+"""
+import argparse, os, time
+from datetime import date, timedelta
+
+# untis_client validates credentials at import; the simulation never uses them
+for _name in ("UNTIS_BASE", "UNTIS_SCHOOL", "UNTIS_USER", "UNTIS_PASS"):
+    os.environ.setdefault(_name, "bench")
+
+import untis_client
+from untis_client import UntisClient, fetch_week_many
+
+
+class SimulatedClient(UntisClient):
+    """UntisClient whose fetch_week only waits for a fixed upstream latency."""
+
+    def __init__(self, label: str, latency: float):
+        super().__init__("https://bench.invalid/WebUntis/jsonrpc.do", "bench", label, "bench", 0, label=label,
+                         master_cache_dir=None)
+        self.latency = latency
+
+    def fetch_week(self, week_start: date):
+        time.sleep(self.latency)
+        return [{"id": f"{self.label}-{week_start}", "date": week_start.isoformat(), "subject": "bench"}]
+
+
+def _sequential(week: date, grades: list[str]) -> None:
+    for grade in grades:
+        untis_client.fetch_week(week, grade)
+
+
+def _concurrent(week: date, grades: list[str]) -> None:
+    fetch_week_many(week, grades)
+
+
+def _timed(fn, week: date, grades: list[str], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(week, grades)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-grade timetable fetching.")
+    parser.add_argument("--latency", type=float, default=0.25, help="Simulated upstream latency per fetch (s).")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per case; best time is reported.")
+    parser.add_argument("--grades", type=int, nargs="*", default=[2, 5, 10], help="Grade counts to simulate.")
+    args = parser.parse_args()
+
+    week = date.today() - timedelta(days=date.today().weekday())
+    print(f"latency={args.latency:.2f}s/fetch  workers={untis_client.FETCH_WORKERS}  rounds={args.rounds}")
+    print(f"{'grades':>6}  {'sequential':>10}  {'concurrent':>10}  {'speedup':>7}")
+    for count in args.grades:
+        labels = [f"G{i:02d}" for i in range(count)]
+        untis_client.CLIENTS.clear()
+        for label in labels:
+            untis_client.CLIENTS[label] = SimulatedClient(label, args.latency)
+        seq = _timed(_sequential, week, labels, args.rounds)
+        conc = _timed(_concurrent, week, labels, args.rounds)
+        print(f"{count:>6}  {seq:>9.3f}s  {conc:>9.3f}s  {seq / conc:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
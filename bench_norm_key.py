@@ -0,0 +1,90 @@
+# bench_norm_key.py
+"""Check norm_key against the previous implementation and time it on the recorded vocabularies.
+
+Inputs: data/subjects_raw_*.txt and data/rooms_raw_all.txt (one raw label per line).
+"""
+import argparse, glob, os, re, sys, tempfile, time
+
+_TMP = tempfile.mkdtemp(prefix="untis-bench-")
+os.environ["DB_PATH"] = os.path.join(_TMP, "bench.db")
+os.environ["REFRESH_INTERVAL_SEC"] = "0"
+for _name, _value in (
+    ("UNTIS_BASE", "https://bench.invalid/WebUntis/jsonrpc.do"),
+    ("UNTIS_SCHOOL", "bench"),
+    ("UNTIS_USER", "bench"),
+    ("UNTIS_PASS", "bench"),
+    ("SECRET_KEY", "bench"),
+    ("ADMIN_TOKEN", "bench"),
+):
+    os.environ.setdefault(_name, _value)
+for _name in ("BACKUP_WEBHOOK_URL", "AUTO_RESTORE_URL"):
+    os.environ.pop(_name, None)
+
+from app import DATA_DIR, norm_key, _norm_key_cached
+
+_UML = str.maketrans({"ä":"a","ö":"o","ü":"u","Ä":"a","Ö":"o","Ü":"u"})
+
+def reference_norm_key(s: str) -> str:
+    """norm_key as it was before memoization (uncompiled re.sub per call)."""
+    if not s:
+        return ""
+    s = s.strip().translate(_UML).lower()
+    s = re.sub(r"\s+", " ", s)
+    s = s.replace("(", " ").replace(")", " ")
+    s = re.sub(r"[-–—]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def _vocabulary() -> list[str]:
+    words: list[str] = []
+    paths = sorted(glob.glob(os.path.join(DATA_DIR, "subjects_raw_*.txt"))) + [os.path.join(DATA_DIR, "rooms_raw_all.txt")]
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                words.extend(line.rstrip("\n") for line in f if line.strip())
+        except FileNotFoundError:
+            print(f"skipping missing {path}")
+    return words
+
+
+def _edge_cases() -> list[str]:
+    spaces = [chr(c) for c in range(0x3000 + 1) if chr(c).isspace() or re.match(r"\s", chr(c))]
+    cases = ["", " ", "Ä-Ö–Ü—ß", "(GK) Mathe -- 1", "  LK\tEnglisch\n(2) ", "a ( ) - b", "İstanbul", "ÄÖÜäöü()"]
+    cases += [f"x{ch}y{ch}(z)" for ch in spaces]
+    return cases
+
+
+def _timed(fn, words: list[str], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for w in words:
+            fn(w)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark norm_key on the recorded subject/room vocabularies.")
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the vocabulary per round (lesson-like repetition).")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per case; best time is reported.")
+    args = parser.parse_args()
+
+    words = _vocabulary()
+    mismatches = [w for w in words + _edge_cases() if norm_key(w) != reference_norm_key(w)]
+    if mismatches:
+        sys.exit(f"norm_key differs from the reference for {len(mismatches)} inputs, e.g. {mismatches[:5]!r}")
+
+    workload = words * args.repeat
+    _norm_key_cached.cache_clear()
+    ref = _timed(reference_norm_key, workload, args.rounds)
+    new = _timed(norm_key, workload, args.rounds)
+    print(f"vocabulary={len(words)} distinct={len(set(words))} calls/round={len(workload)}  outputs identical")
+    print(f"{'reference':>10}  {'norm_key':>10}  {'speedup':>7}")
+    print(f"{ref * 1000:>8.2f}ms  {new * 1000:>8.2f}ms  {ref / new:>6.1f}x")
+    print(f"cache: {_norm_key_cached.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
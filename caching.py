@@ -0,0 +1,243 @@
+"""Caching primitives for upstream (WebUntis) results."""
+import json, os, sqlite3, threading, time
+from collections import OrderedDict
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key: the first caller runs fn, everyone
+    arriving while it is in flight waits and gets the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def do(self, key: str, fn):
+        """Return (result, shared) where shared is True for callers that piggybacked."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class _CacheStats:
+    """Hit/miss counters shared by the cache backends (per process)."""
+
+    backend = "base"
+
+    def _init_stats(self, name: str, max_entries: int, ttl: float | None):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit: bool, record: bool = True) -> None:
+        if not record:
+            return
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "backend": self.backend,
+            "entries": len(self),
+            "maxEntries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hitRate": round(hits / total, 4) if total else None,
+        }
+
+
+class MemoryCache(_CacheStats):
+    """
+    In-process LRU. get() returns (value, stored_at) or None; entries expire
+    ttl seconds after they were stored. Values are shared, callers must not mutate them.
+    """
+
+    backend = "memory"
+
+    def __init__(self, name: str, max_entries: int = 256, ttl: float | None = None):
+        self._init_stats(name, max_entries, ttl)
+        self._lock = threading.Lock()
+        self._data: OrderedDict[str, tuple[object, float, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key: str, record: bool = True):
+        """Return (value, stored_at) or None; record=False keeps the lookup out of the counters."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= now:
+                del self._data[key]
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+        self._count(entry is not None, record)
+        return None if entry is None else (entry[0], entry[1])
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, now, now + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(_CacheStats):
+    """
+    Cache shared by all workers on a host: one SQLite file in WAL mode, values
+    stored as JSON. Over max_entries the oldest stored entries are evicted.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, name: str, path: str, max_entries: int = 256, ttl: float | None = None):
+        self._init_stats(name, max_entries, ttl)
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                ns TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (ns, key)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_age ON cache_entries (ns, stored_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self) -> int:
+        try:
+            return self._conn().execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE ns = ?", (self.name,)
+            ).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def get(self, key: str, record: bool = True):
+        try:
+            row = self._conn().execute(
+                "SELECT value, stored_at, expires_at FROM cache_entries WHERE ns = ? AND key = ?",
+                (self.name, key),
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is not None and row[2] is not None and row[2] <= time.time():
+            self.delete(key)
+            row = None
+        self._count(row is not None, record)
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            return None
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (ns, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (self.name, key, json.dumps(value, ensure_ascii=False), now, now + ttl if ttl else None),
+            )
+            conn.execute(
+                """
+                DELETE FROM cache_entries WHERE ns = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE ns = ? ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.name, self.name, self.max_entries),
+            )
+        except sqlite3.Error:
+            pass  # a cache write failure must never fail the request
+
+    def delete(self, key: str) -> None:
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE ns = ? AND key = ?", (self.name, key))
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE ns = ?", (self.name,))
+        except sqlite3.Error:
+            pass
+
+
+def make_cache(name: str, backend: str = "memory", path: str | None = None,
+               max_entries: int = 256, ttl: float | None = None):
+    """Build a cache by backend name ("memory" or "sqlite")."""
+    if (backend or "").strip().lower() == "sqlite":
+        if not path:
+            raise ValueError("sqlite cache backend requires a path")
+        return SQLiteCache(name, path, max_entries=max_entries, ttl=ttl)
+    return MemoryCache(name, max_entries=max_entries, ttl=ttl)
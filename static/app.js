@@ -300,7 +300,7 @@ async function loadVacations(force = false){
     return VACATIONS;
   }
   try {
-    const res = await fetch(`/api/vacations?ts=${now}`, { cache: 'no-store' });
+    const res = await fetch("/api/vacations", { cache: "no-cache" });
     if (!res.ok) throw new Error(res.statusText || 'vacations fetch failed');
     const data = await res.json();
     if (data && Array.isArray(data.vacations)){
@@ -414,7 +414,7 @@ async function loadExams(force = false){
     return EXAMS;
   }
   try {
-    const res = await fetch(`/api/exams?ts=${now}`, { cache: "no-store" });
+    const res = await fetch("/api/exams", { cache: "no-cache" });
     if (!res.ok) throw new Error(res.statusText || "exams fetch failed");
     const data = await res.json();
     if (data && data.ok === false){
@@ -632,7 +632,7 @@ async function loadMappings() {
 
   if (MAPS_READY) return;
 
-  const res = await fetch(`/api/mappings?v=${Date.now()}`, { cache: "no-store" });
+  const res = await fetch("/api/mappings", { cache: "no-cache" });
 
   if (!res.ok) throw new Error("Failed to load /api/mappings");
 
@@ -1213,7 +1213,7 @@ async function loadCourseOptions() {
 
   try {
 
-    const res = await fetch(`/api/courses?v=${Date.now()}`, { cache: 'no-store' });
+    const res = await fetch("/api/courses", { cache: "no-cache" });
 
     if (res.ok) {
 
@@ -3832,7 +3832,6 @@ async function loadTimetable(force = false, weekStart = null) {
     await loadCourseOptions();
 
     const params = new URLSearchParams();
-    params.set("ts", Date.now());
     if (force) params.set("force", "1");
     const targetWeekStart =
       (typeof weekStart === "string" && weekStart) ||
@@ -3843,7 +3842,7 @@ async function loadTimetable(force = false, weekStart = null) {
       window.__currentWeekStart = targetWeekStart;
     }
 
-    const res = await fetch(`/api/timetable?${params.toString()}`, { cache: "no-store" });
+    const res = await fetch(`/api/timetable?${params.toString()}`, { cache: "no-cache" });
 
     if (!res.ok) throw new Error(`/api/timetable ${res.status}`);
 
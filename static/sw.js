@@ -27,11 +27,11 @@ self.addEventListener("message", (event) => {
 self.addEventListener("fetch", (event) => {
   const url = new URL(event.request.url);
 
-  // --- API: always fresh, fallback if offline
+  // --- API: always revalidated (ETag/304), fallback if offline
   if (url.pathname.startsWith("/api/")) {
     event.respondWith((async () => {
       try {
-        return await fetch(event.request, { cache: "no-store" });
+        return await fetch(event.request, { cache: "no-cache" });
       } catch {
         const cached = await caches.match(event.request);
         return (
@@ -0,0 +1,47 @@
+"""Small file persistence helpers shared by the app and the Untis client."""
+import json, os, threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX dev machines: locks degrade to no-ops
+    fcntl = None
+
+
+def read_json(path: str, default=None):
+    """Load JSON from path; return default when missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return default
+
+
+def atomic_write_json(path: str, obj, indent: int | None = None, private: bool = False) -> None:
+    """Write JSON via temp file + rename so readers never see a half-written file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # unique temp name: several gunicorn workers/threads may write the same target
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=indent)
+        if private:
+            os.chmod(tmp, 0o600)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive flock on path (created if missing) across processes and threads."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
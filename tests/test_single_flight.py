@@ -0,0 +1,92 @@
+"""Concurrent identical requests must share one upstream call (single-flight)."""
+import os, sys, tempfile, threading, time
+
+_TMP = tempfile.mkdtemp(prefix="untis-test-")
+os.environ["DB_PATH"] = os.path.join(_TMP, "test.db")
+os.environ["ARCHIVE_PATH"] = os.path.join(_TMP, "archive.db")
+os.environ["LAST_GOOD_DIR"] = os.path.join(_TMP, "last_good")
+os.environ["SNAPSHOT_DIR"] = os.path.join(_TMP, "snapshots")
+os.environ["SNAPSHOT_INTERVAL_MIN"] = "0"
+os.environ["REFRESH_INTERVAL_SEC"] = "0"
+os.environ["PREFETCH_WEEKS"] = "0"
+for _name, _value in (
+    ("UNTIS_BASE", "https://test.invalid/WebUntis/jsonrpc.do"),
+    ("UNTIS_SCHOOL", "test"),
+    ("UNTIS_USER", "test"),
+    ("UNTIS_PASS", "test"),
+    ("SECRET_KEY", "test"),
+    ("ADMIN_TOKEN", "test"),
+):
+    os.environ.setdefault(_name, _value)
+for _name in ("BACKUP_WEBHOOK_URL", "AUTO_RESTORE_URL"):
+    os.environ.pop(_name, None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from caching import SingleFlight
+
+CONCURRENCY = 50
+
+
+def _fire(fn, count: int = CONCURRENCY) -> list:
+    """Run fn from count threads released at the same moment; returns their results."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def _worker(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=_worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class _SlowCounter:
+    def __init__(self, result, delay: float = 0.3):
+        self.calls = 0
+        self.result = result
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.result() if callable(self.result) else self.result
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    upstream = _SlowCounter("payload")
+    results = _fire(lambda: flights.do("week:2026-10-12", upstream))
+    assert upstream.calls == 1
+    assert [r[0] for r in results] == ["payload"] * CONCURRENCY
+    assert sum(1 for _, shared in results if not shared) == 1
+    assert flights.in_flight() == 0
+
+
+def test_timetable_force_requests_share_one_fetch(monkeypatch):
+    grades = app_module.available_grades() or ["EF"]
+    upstream = _SlowCounter(lambda: {g: [] for g in grades})
+    monkeypatch.setattr(app_module, "fetch_week_many", upstream)
+    ws = app_module._default_week_start() + app_module.timedelta(days=21)  # not cached, not archived
+    client = app_module.app.test_client()
+
+    statuses = _fire(lambda: client.get(f"/api/timetable?weekStart={ws}&force=1").status_code)
+    assert upstream.calls == 1
+    assert statuses == [200] * CONCURRENCY
+
+
+def test_exam_requests_share_one_fetch(monkeypatch):
+    upstream = _SlowCounter(lambda: ([], {"subjects": {}, "classes": {}, "teachers": {}}))
+    monkeypatch.setattr(app_module, "fetch_exams_bundle", upstream)
+    grades = app_module.available_grades() or ["EF"]
+    client = app_module.app.test_client()
+
+    statuses = _fire(lambda: client.get("/api/exams?start=2030-03-04&end=2030-03-08&grade=" + grades[0]).status_code)
+    assert upstream.calls == 1
+    assert statuses == [200] * CONCURRENCY
@@ -1,6 +1,10 @@
-import os, time, requests
+import os, time, hashlib, threading, requests
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import date, timedelta
 
+from storage import read_json, atomic_write_json, file_lock
+
 # ---- Env helpers ----
 def _require(name: str) -> str:
     val = os.getenv(name)
@@ -32,10 +36,128 @@ PASS_Q1  = os.getenv("UNTIS_PASS_Q1")
 EID_Q1   = _int_env("UNTIS_ELEMENT_ID_Q1", EID)
 ETYPE_Q1 = _int_env("UNTIS_ELEMENT_TYPE_Q1", ETYPE)
 
+# Master data (teachers/subjects/rooms/classes) changes a few times a year
+MASTER_TTL_SEC   = _int_env("UNTIS_MASTER_TTL_SEC", 6 * 60 * 60)
+MASTER_CACHE_DIR = (os.getenv("UNTIS_MASTER_CACHE_DIR") or "").strip() or None  # optional disk persistence
+
+# JSON-RPC 2.0 batching; servers that reject batches get sequential calls for a while
+RPC_BATCH_ENABLED   = str(os.getenv("UNTIS_RPC_BATCH", "1")).strip().lower() not in ("0", "false", "no", "off")
+RPC_BATCH_RETRY_SEC = _int_env("UNTIS_RPC_BATCH_RETRY_SEC", 60 * 60)
+
+
+# Concurrent per-grade fetching (one worker thread per grade request)
+FETCH_WORKERS     = max(1, _int_env("UNTIS_FETCH_WORKERS", 16))
+FETCH_TIMEOUT_SEC = max(1, _int_env("UNTIS_FETCH_TIMEOUT_SEC", 30))
+
+# Multi-week range fetches are split into getTimetable chunks of this many days
+RANGE_CHUNK_DAYS = max(7, _int_env("UNTIS_RANGE_CHUNK_DAYS", 35))
+
+
+# JSESSIONID sharing: set UNTIS_SESSION_STORE to a JSON file path shared by all workers
+SESSION_STORE_PATH = (os.getenv("UNTIS_SESSION_STORE") or "").strip() or None
+SESSION_TTL_SEC    = max(60, _int_env("UNTIS_SESSION_TTL_SEC", 10 * 60))
+
+
+class MemorySessionStore:
+    """Per-process JSESSIONID cache (key -> (session id, expires at))."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._refresh_locks: dict[str, threading.Lock] = {}
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        with self._lock:
+            return self._data.get(key)
+
+    def put(self, key: str, sess_id: str, expires_at: float) -> None:
+        with self._lock:
+            self._data[key] = (sess_id, expires_at)
+
+    def invalidate(self, key: str, sess_id: str | None = None) -> None:
+        """Drop the session for key; with sess_id only if it is still the stored one."""
+        with self._lock:
+            current = self._data.get(key)
+            if current and (sess_id is None or current[0] == sess_id):
+                self._data.pop(key, None)
+
+    @contextmanager
+    def refresh_lock(self, key: str):
+        """Serialise re-authentication for key so only one caller logs in."""
+        with self._lock:
+            lock = self._refresh_locks.setdefault(key, threading.Lock())
+        with lock:
+            yield
+
+
+class FileSessionStore(MemorySessionStore):
+    """
+    JSON file shared by all gunicorn workers. Writes are flock-protected and atomic;
+    refresh_lock is a per-key file lock, so exactly one worker re-authenticates.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._write_lock_path = path + ".lock"
+
+    def _read(self) -> dict:
+        data = read_json(self.path, {})
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        entry = self._read().get(key)
+        if not isinstance(entry, dict) or not entry.get("sessionId"):
+            return None
+        try:
+            return str(entry["sessionId"]), float(entry.get("expiresAt") or 0)
+        except (TypeError, ValueError):
+            return None
+
+    def put(self, key: str, sess_id: str, expires_at: float) -> None:
+        with file_lock(self._write_lock_path):
+            data = self._read()
+            now = time.time()
+            # prune expired logins of other keys while we are here
+            data = {k: v for k, v in data.items() if isinstance(v, dict) and float(v.get("expiresAt") or 0) > now}
+            data[key] = {"sessionId": sess_id, "expiresAt": expires_at}
+            atomic_write_json(self.path, data, private=True)
+
+    def invalidate(self, key: str, sess_id: str | None = None) -> None:
+        with file_lock(self._write_lock_path):
+            data = self._read()
+            current = data.get(key)
+            if isinstance(current, dict) and (sess_id is None or current.get("sessionId") == sess_id):
+                data.pop(key, None)
+                atomic_write_json(self.path, data, private=True)
+
+    @contextmanager
+    def refresh_lock(self, key: str):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        with super().refresh_lock(key):  # threads of this worker first, then other workers
+            with file_lock(f"{self.path}.{digest}.refresh.lock"):
+                yield
+
+
+def _default_session_store() -> MemorySessionStore:
+    return FileSessionStore(SESSION_STORE_PATH) if SESSION_STORE_PATH else MemorySessionStore()
+
+
+class BatchRejected(RuntimeError):
+    """The server did not answer a JSON-RPC batch with a matching response array."""
+
 
 class UntisClient:
     """Thin helper around the Untis JSON-RPC/REST APIs (per login)."""
 
+    # cached lookup kind -> JSON-RPC method
+    MASTER_METHODS = {
+        "teachers": "getTeachers",
+        "subjects": "getSubjects",
+        "rooms": "getRooms",
+        "classes": "getKlassen",
+    }
+
     def __init__(
         self,
         base: str,
@@ -45,6 +167,9 @@ class UntisClient:
         element_id: int,
         element_type: int = 5,
         label: str | None = None,
+        master_ttl: int = MASTER_TTL_SEC,
+        master_cache_dir: str | None = MASTER_CACHE_DIR,
+        session_store: MemorySessionStore | None = None,
     ):
         self.base = (base or "").strip()
         self.school = (school or "").strip()
@@ -58,6 +183,14 @@ class UntisClient:
         self.session = requests.Session()
         self._sess_id: str | None = None
         self._sess_exp: float = 0.0  # epoch seconds when cached session should be considered stale
+        self.session_store = session_store or SESSION_STORE
+        self._session_key = f"{self.base}|{self.school}|{self.user}"
+        self.master_ttl = max(0, int(master_ttl))
+        self.master_cache_dir = master_cache_dir
+        self._master: dict[str, tuple[float, dict[int, str]]] = {}  # kind -> (fetched_at, {id: name})
+        self._master_lock = threading.Lock()
+        self._load_master_from_disk()
+        self._batch_disabled_until: float = 0.0 if RPC_BATCH_ENABLED else float("inf")
 
     # ----- small utils -----
     def _rest_base(self) -> str:
@@ -84,6 +217,10 @@ class UntisClient:
         except Exception:
             return ""
 
+    @staticmethod
+    def _names_by_id(items) -> dict[int, str]:
+        return {x["id"]: (x.get("longName") or x.get("name") or "") for x in items or []}
+
     @staticmethod
     def _is_not_authenticated(err: Exception) -> bool:
         s = str(err).lower()
@@ -131,21 +268,76 @@ class UntisClient:
             raise RuntimeError(f"RPC {method} -> {j['error']}")
         return j["result"]
 
+    def _rpc_batch_raw(self, calls: list[tuple[str, dict | None]], cookies=None) -> list:
+        """
+        Low-level JSON-RPC batch. Returns one entry per call: the result, or a
+        RuntimeError for per-call errors. Raises BatchRejected if the server
+        does not speak batches (4xx, unparsable or non-array body); 5xx errors
+        propagate like in _rpc, so an outage does not switch batching off.
+        """
+        body = [
+            {"id": str(i), "method": method, "params": params or {}, "jsonrpc": "2.0"}
+            for i, (method, params) in enumerate(calls)
+        ]
+        r = self.session.post(
+            self.base,
+            params={"school": self.school},
+            json=body,
+            cookies=cookies,
+            timeout=25,
+        )
+        if 400 <= r.status_code < 500:
+            raise BatchRejected(f"RPC batch -> HTTP {r.status_code}")
+        r.raise_for_status()
+        try:
+            j = r.json()
+        except ValueError as exc:
+            raise BatchRejected(f"RPC batch -> {exc}")
+        if not isinstance(j, list):
+            raise BatchRejected(f"RPC batch -> {j.get('error') if isinstance(j, dict) else j!r}")
+        by_id = {str(item.get("id")): item for item in j if isinstance(item, dict)}
+        out = []
+        for i, (method, _params) in enumerate(calls):
+            item = by_id.get(str(i))
+            if item is None:
+                raise BatchRejected(f"RPC batch -> missing response for {method}")
+            if "error" in item:
+                out.append(RuntimeError(f"RPC {method} -> {item['error']}"))
+            else:
+                out.append(item.get("result"))
+        return out
+
     def _invalidate_session(self):
+        # drop it from the shared store too, unless another worker already replaced it
+        if self._sess_id:
+            self.session_store.invalidate(self._session_key, self._sess_id)
         self._sess_id = None
         self._sess_exp = 0.0
 
+    def _adopt_stored_session(self) -> bool:
+        entry = self.session_store.get(self._session_key)
+        if entry and time.time() < entry[1]:
+            self._sess_id, self._sess_exp = entry
+            return True
+        return False
+
     def _login(self, refresh: bool = False):
-        """Authenticate if needed; cache JSESSIONID for a short window."""
-        now = time.time()
-        if not refresh and self._sess_id and now < self._sess_exp:
-            return {"JSESSIONID": self._sess_id}
-
-        # force new login
-        res = self._rpc("authenticate", {"user": self.user, "password": self.password, "client": "untis-pwa"})
-        self._sess_id = res["sessionId"]
-        # Keep the window conservative; Render free dynos can idle - the token may vanish earlier.
-        self._sess_exp = now + 10 * 60  # ~10 minutes
+        """Authenticate if needed; JSESSIONID is cached locally and in the shared session store."""
+        if not refresh:
+            if self._sess_id and time.time() < self._sess_exp:
+                return {"JSESSIONID": self._sess_id}
+            if self._adopt_stored_session():
+                return {"JSESSIONID": self._sess_id}
+
+        with self.session_store.refresh_lock(self._session_key):
+            # another thread/worker may have logged in while we waited for the lock
+            if self._adopt_stored_session():
+                return {"JSESSIONID": self._sess_id}
+            res = self._rpc("authenticate", {"user": self.user, "password": self.password, "client": "untis-pwa"})
+            self._sess_id = res["sessionId"]
+            # Keep the window conservative; Render free dynos can idle - the token may vanish earlier.
+            self._sess_exp = time.time() + SESSION_TTL_SEC
+            self.session_store.put(self._session_key, self._sess_id, self._sess_exp)
         return {"JSESSIONID": self._sess_id}
 
     def _rpc_auth(self, method: str, params=None):
@@ -162,6 +354,150 @@ class UntisClient:
                 return self._rpc(method, params, cookies=self._login(refresh=True))
             raise
 
+    def _rpc_sequential(self, calls: list[tuple[str, dict | None]]) -> list:
+        out = []
+        for method, params in calls:
+            try:
+                out.append(self._rpc_auth(method, params))
+            except Exception as exc:
+                out.append(exc)
+        return out
+
+    def _rpc_batch_auth(self, calls: list[tuple[str, dict | None]]) -> list:
+        """Batch with the same auto re-login as _rpc_auth (whole batch retried once)."""
+        results = self._rpc_batch_raw(calls, cookies=self._login())
+        if any(isinstance(res, Exception) and self._is_not_authenticated(res) for res in results):
+            self._invalidate_session()
+            results = self._rpc_batch_raw(calls, cookies=self._login(refresh=True))
+        return results
+
+    def rpc_batch(self, calls, return_exceptions: bool = False) -> list:
+        """
+        Authenticated JSON-RPC batch: [(method, params), ...] -> [result, ...] in one POST.
+        With return_exceptions, failed calls yield their exception instead of raising.
+        Falls back to one request per call if the server rejects batches.
+        """
+        calls = list(calls)
+        if not calls:
+            return []
+        if len(calls) == 1 or time.time() < self._batch_disabled_until:
+            results = self._rpc_sequential(calls)
+        else:
+            try:
+                results = self._rpc_batch_auth(calls)
+            except BatchRejected:
+                self._batch_disabled_until = time.time() + RPC_BATCH_RETRY_SEC
+                results = self._rpc_sequential(calls)
+        if not return_exceptions:
+            for res in results:
+                if isinstance(res, Exception):
+                    raise res
+        return results
+
+    # ----- master data cache -----
+    def _master_cache_path(self) -> str | None:
+        if not self.master_cache_dir:
+            return None
+        safe = "".join(ch if ch.isalnum() else "_" for ch in self.label.lower())
+        return os.path.join(self.master_cache_dir, f"untis_master_{safe}.json")
+
+    def _load_master_from_disk(self) -> None:
+        """Seed the master cache from disk so a restarted worker skips the downloads."""
+        path = self._master_cache_path()
+        if not path:
+            return
+        data = read_json(path, {})
+        if not isinstance(data, dict) or data.get("user") != self.user:
+            return
+        for kind, entry in (data.get("master") or {}).items():
+            if kind not in self.MASTER_METHODS or not isinstance(entry, dict):
+                continue
+            try:
+                items = {int(k): str(v or "") for k, v in (entry.get("items") or {}).items()}
+                self._master[kind] = (float(entry.get("fetchedAt") or 0), items)
+            except (TypeError, ValueError):
+                continue
+
+    def _save_master_to_disk(self) -> None:
+        path = self._master_cache_path()
+        if not path:
+            return
+        with self._master_lock:
+            snapshot = {
+                kind: {"fetchedAt": ts, "items": items}
+                for kind, (ts, items) in self._master.items()
+            }
+        try:
+            atomic_write_json(path, {"user": self.user, "master": snapshot})
+        except Exception:
+            pass  # persistence is best-effort
+
+    def _master_cached(self, kind: str, allow_stale: bool = False) -> dict[int, str] | None:
+        entry = self._master.get(kind)
+        if not entry:
+            return None
+        fetched_at, items = entry
+        if allow_stale or (time.time() - fetched_at) < self.master_ttl:
+            return items
+        return None
+
+    def _store_master(self, kind: str, raw_items) -> dict[int, str]:
+        items = self._names_by_id(raw_items)
+        with self._master_lock:
+            self._master[kind] = (time.time(), items)
+        self._save_master_to_disk()
+        return items
+
+    def _master_from_result(self, kind: str, result) -> dict[int, str]:
+        """Store a lookup result; on errors a stale copy beats an empty map."""
+        if not isinstance(result, Exception):
+            try:
+                return self._store_master(kind, result)
+            except Exception:
+                pass
+        stale = self._master_cached(kind, allow_stale=True)
+        return stale if stale is not None else {}
+
+    def _batch_with_master(self, calls: list[tuple[str, dict]], kinds) -> tuple[list, dict[str, dict[int, str]]]:
+        """
+        Run calls in one batch together with any expired master-data lookups.
+        Returns (results for calls, {kind: {id: name}}).
+        """
+        missing = [k for k in kinds if self._master_cached(k) is None]
+        batch = list(calls) + [(self.MASTER_METHODS[k], {}) for k in missing]
+        results = self.rpc_batch(batch, return_exceptions=True)
+        maps = {kind: self._master_from_result(kind, res) for kind, res in zip(missing, results[len(calls):])}
+        for kind in kinds:
+            if kind not in maps:
+                maps[kind] = self._master_cached(kind, allow_stale=True) or {}
+        return results[:len(calls)], maps
+
+    def master_map(self, kind: str, refresh: bool = False) -> dict[int, str]:
+        """
+        Return {id: name} for teachers/subjects/rooms/classes from the TTL cache.
+        Downloads on miss/expiry; on upstream errors a stale copy beats an empty map.
+        """
+        if kind not in self.MASTER_METHODS:
+            raise ValueError(f"unknown master data kind: {kind}")
+        if not refresh:
+            cached = self._master_cached(kind)
+            if cached is not None:
+                return cached
+        try:
+            result = self._rpc_auth(self.MASTER_METHODS[kind], {})
+        except Exception as exc:
+            result = exc
+        return self._master_from_result(kind, result)
+
+    def invalidate_master(self, kind: str | None = None) -> None:
+        """Drop cached master data (one kind or all); the next lookup downloads it again."""
+        with self._master_lock:
+            if kind is None:
+                self._master.clear()
+            else:
+                self._master.pop(kind, None)
+        self._save_master_to_disk()
+
     # ----- public APIs -----
     def _rest_exams(self, start_date: date, end_date: date, exam_type_id: int = 0):
         """
@@ -213,12 +549,8 @@ class UntisClient:
                 raise RuntimeError(f"REST exams error: {payload.get('message')}")
         raise RuntimeError("REST exams: unexpected response")
 
-    def fetch_week(self, week_start: date):
-        """Fetch timetable Mon-Sun starting at week_start (Monday recommended)."""
-        s, e = week_start, week_start + timedelta(days=7)
-
-        # raw timetable (with auto re-login)
-        tt = self._rpc_auth(
+    def _timetable_call(self, s: date, e: date) -> tuple[str, dict]:
+        return (
             "getTimetable",
             {
                 "options": {
@@ -229,30 +561,57 @@ class UntisClient:
             },
         )
 
-        # Lookups (also protected by auto re-login)
-        try:
-            teachers = {
-                t["id"]: (t.get("longName") or t.get("name") or "")
-                for t in self._rpc_auth("getTeachers", {})
-            }
-        except Exception:
-            teachers = {}
+    def fetch_week(self, week_start: date):
+        """Fetch timetable Mon-Sun starting at week_start (Monday recommended)."""
+        s, e = week_start, week_start + timedelta(days=6)  # same Mon-Sun span as one fetch_range week
 
-        try:
-            subjects = {
-                s["id"]: (s.get("longName") or s.get("name") or "")
-                for s in self._rpc_auth("getSubjects", {})
-            }
-        except Exception:
-            subjects = {}
+        # raw timetable plus any expired lookups in one batch (with auto re-login)
+        (tt,), maps = self._batch_with_master([self._timetable_call(s, e)], ("teachers", "subjects", "rooms"))
+        if isinstance(tt, Exception):
+            raise tt
+        return self._build_lessons(tt, maps)
 
-        try:
-            rooms = {
-                r["id"]: (r.get("longName") or r.get("name") or "")
-                for r in self._rpc_auth("getRooms", {})
-            }
-        except Exception:
-            rooms = {}
+    def fetch_range(self, start: date, end: date) -> dict[date, list[dict]]:
+        """
+        Fetch every week touching start..end with as few getTimetable calls as possible.
+
+        The span is split into RANGE_CHUNK_DAYS chunks that travel in a single batch.
+        Returns {monday: [lessons Mon-Sun]} for each week, including empty weeks.
+        """
+        if end < start:
+            start, end = end, start
+        first = start - timedelta(days=start.weekday())
+        last = end - timedelta(days=end.weekday()) + timedelta(days=6)
+
+        calls = []
+        chunk_start = first
+        while chunk_start <= last:
+            chunk_end = min(last, chunk_start + timedelta(days=RANGE_CHUNK_DAYS - 1))
+            calls.append(self._timetable_call(chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+
+        results, maps = self._batch_with_master(calls, ("teachers", "subjects", "rooms"))
+        weeks: dict[date, list[dict]] = {}
+        monday = first
+        while monday <= last:
+            weeks[monday] = []
+            monday += timedelta(days=7)
+        for tt in results:
+            if isinstance(tt, Exception):
+                raise tt
+            for lesson in self._build_lessons(tt, maps):
+                try:
+                    d = date.fromisoformat(lesson["date"])
+                except ValueError:
+                    continue
+                bucket = weeks.get(d - timedelta(days=d.weekday()))
+                if bucket is not None:
+                    bucket.append(lesson)
+        return weeks
+
+    def _build_lessons(self, tt, maps: dict[str, dict[int, str]]) -> list[dict]:
+        """Turn raw getTimetable items into the lesson dicts the frontend expects."""
+        teachers, subjects, rooms = maps["teachers"], maps["subjects"], maps["rooms"]
 
         lessons = []
         for x in tt:
@@ -313,47 +672,54 @@ class UntisClient:
         except Exception as exc:  # keep the error in case RPC fails too
             first_error = exc
 
-        payload = {
+        try:
+            return self._rpc_auth("getExams", self._exam_params(start_date, end_date, exam_type_id))
+        except Exception:
+            if first_error:
+                raise first_error
+            raise
+
+    def _exam_params(self, start_date: date, end_date: date, exam_type_id: int) -> dict:
+        return {
             "startDate": self._yyyymmdd(start_date),
             "endDate": self._yyyymmdd(end_date),
             "examTypeId": int(exam_type_id),
         }
+
+    def fetch_exams_bundle(self, start_date: date, end_date: date, exam_type_id: int = 0):
+        """
+        Fetch exams plus subject/class/teacher maps in as few round trips as possible.
+
+        Returns (exams, {"subjects": ..., "classes": ..., "teachers": ...}). REST exams
+        cannot be batched, so expired lookups go out as one batch; if REST fails the
+        JSON-RPC getExams call rides along in that same batch.
+        """
+        kinds = ("subjects", "classes", "teachers")
         try:
-            return self._rpc_auth("getExams", payload)
-        except Exception:
-            if first_error:
+            exams = self._rest_exams(start_date, end_date, exam_type_id)
+        except Exception as first_error:
+            (exams,), maps = self._batch_with_master(
+                [("getExams", self._exam_params(start_date, end_date, exam_type_id))], kinds
+            )
+            if isinstance(exams, Exception):
                 raise first_error
-            raise
+            return exams, maps
+        _, maps = self._batch_with_master([], kinds)
+        return exams, maps
 
     def fetch_subject_map(self) -> dict[int, str]:
-        try:
-            return {
-                s["id"]: (s.get("longName") or s.get("name") or "")
-                for s in self._rpc_auth("getSubjects", {})
-            }
-        except Exception:
-            return {}
+        return self.master_map("subjects")
 
     def fetch_class_map(self) -> dict[int, str]:
-        try:
-            return {
-                c["id"]: (c.get("longName") or c.get("name") or "")
-                for c in self._rpc_auth("getKlassen", {})
-            }
-        except Exception:
-            return {}
+        return self.master_map("classes")
 
     def fetch_teacher_map(self) -> dict[int, str]:
-        try:
-            return {
-                t["id"]: (t.get("longName") or t.get("name") or "")
-                for t in self._rpc_auth("getTeachers", {})
-            }
-        except Exception:
-            return {}
+        return self.master_map("teachers")
 
 
 # ---- Instantiate clients ----
+SESSION_STORE = _default_session_store()
+
 CLIENTS: dict[str, UntisClient] = {}
 
 CLIENTS["EF"] = UntisClient(BASE, SCHOOL, USER, PASS, EID, ETYPE, label="EF")
@@ -384,16 +750,67 @@ def _pick_client(grade: str | None = None) -> UntisClient:
     return next(iter(CLIENTS.values()))
 
 
+# ---- Concurrent fetch engine ----
+_fetch_pool: ThreadPoolExecutor | None = None
+_fetch_pool_lock = threading.Lock()
+
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="untis-fetch")
+        return _fetch_pool
+
+
+def run_per_grade(fn, grades: list[str] | None = None, timeout: float | None = None) -> dict:
+    """
+    Run fn(client) for each grade in parallel.
+
+    Returns {grade: result-or-exception}; grades that miss the deadline get a
+    TimeoutError. One slow or failing login never blocks the others.
+    """
+    grades = list(grades) if grades is not None else available_grades()
+    timeout = FETCH_TIMEOUT_SEC if timeout is None else timeout
+    out: dict = {}
+    futures = {}
+    pool = _get_fetch_pool()
+    for grade in grades:
+        try:
+            futures[pool.submit(fn, _pick_client(grade))] = grade
+        except Exception as exc:
+            out[grade] = exc
+    done, pending = wait(futures, timeout=timeout)
+    for fut in done:
+        exc = fut.exception()
+        out[futures[fut]] = exc if exc is not None else fut.result()
+    for fut in pending:
+        fut.cancel()
+        out[futures[fut]] = TimeoutError(f"Untis fetch timed out after {timeout}s")
+    return {grade: out[grade] for grade in grades}
+
+
 # ---- Legacy-compatible module-level helpers ----
 def fetch_week(week_start: date, grade: str | None = None):
     return _pick_client(grade).fetch_week(week_start)
 
 
+def fetch_range(start: date, end: date, grade: str | None = None) -> dict[date, list[dict]]:
+    return _pick_client(grade).fetch_range(start, end)
+
+
+def fetch_week_many(week_start: date, grades: list[str] | None = None, timeout: float | None = None) -> dict:
+    """Fetch one week for several grades in parallel: {grade: lessons-or-exception}."""
+    return run_per_grade(lambda client: client.fetch_week(week_start), grades, timeout)
+
+
 def fetch_week_all(week_start: date) -> dict[str, list[dict]]:
-    """Fetch timetables for all configured grades."""
+    """Fetch timetables for all configured grades (in parallel)."""
     out: dict[str, list[dict]] = {}
-    for label, client in CLIENTS.items():
-        out[label] = client.fetch_week(week_start)
+    for label, res in fetch_week_many(week_start, list(CLIENTS.keys())).items():
+        if isinstance(res, Exception):
+            raise res
+        out[label] = res
     return out
 
 
@@ -401,6 +818,10 @@ def fetch_exams(start_date: date, end_date: date, exam_type_id: int = 0, grade:
     return _pick_client(grade).fetch_exams(start_date, end_date, exam_type_id)
 
 
+def fetch_exams_bundle(start_date: date, end_date: date, exam_type_id: int = 0, grade: str | None = None):
+    return _pick_client(grade).fetch_exams_bundle(start_date, end_date, exam_type_id)
+
+
 def fetch_subject_map(grade: str | None = None) -> dict[int, str]:
     return _pick_client(grade).fetch_subject_map()
 
@@ -411,3 +832,10 @@ def fetch_class_map(grade: str | None = None) -> dict[int, str]:
 
 def fetch_teacher_map(grade: str | None = None) -> dict[int, str]:
     return _pick_client(grade).fetch_teacher_map()
+
+
+def invalidate_master_data(grade: str | None = None, kind: str | None = None) -> None:
+    """Drop cached master data for one grade (or all clients when grade is None)."""
+    clients = [_pick_client(grade)] if grade else list(CLIENTS.values())
+    for client in clients:
+        client.invalidate_master(kind)